@@ -4,7 +4,6 @@ import argparse
 import contextlib
 import json
 import logging
-import time
 from abc import abstractmethod
 from collections.abc import Generator
 from collections.abc import Sequence
@@ -13,20 +12,56 @@ from typing import Callable
 from typing import Final
 from typing import final
 from typing import Generic
+from typing import Optional
 from typing import TypeVar
 
-import cv2
-import serial
+import numpy
 
+from ._broker import Broker as Broker  # noqa: F401
+from ._broker import BrokerSource as BrokerSource  # noqa: F401
 from ._button import Button as Button
 from ._capture import Capture as Capture
 from ._color import Color as Color
+from ._color import Metric as Metric
+from ._emulator import Emulator as Emulator  # noqa: F401
+from ._emulator import EmulatorEvent as EmulatorEvent  # noqa: F401
 from ._frame import Frame as Frame
+from ._input import InputRecorder as InputRecorder  # noqa: F401
+from ._input import InputRecording as InputRecording  # noqa: F401
+from ._input import RecordedInput as RecordedInput  # noqa: F401
 from ._logging import log as log
 from ._logging import LOG_TRACE as LOG_TRACE
 from ._logging import LOGGERS as LOGGERS  # noqa: F401
+from ._macro import Macro as Macro
+from ._macro import MacroHandle as MacroHandle
+from ._macro import Step as Step  # noqa: F401
+from ._motion import MotionDetector as MotionDetector
+from ._motion import MotionSample as MotionSample  # noqa: F401
 from ._pos import LOADING_SCREEN_POS as LOADING_SCREEN_POS
 from ._pos import Pos as Pos
+from ._pos import Rect as Rect  # noqa: F401
+from ._probe import ProbeSet as ProbeSet  # noqa: F401
+from ._recorder import DropPolicy as DropPolicy  # noqa: F401
+from ._serial import SerialCommand as SerialCommand  # noqa: F401
+from ._serial import SerialWriter as SerialWriter
+from ._signature import ScreenSignature as ScreenSignature
+from ._simulator import Simulation as Simulation  # noqa: F401
+from ._simulator import SimulationScreen as SimulationScreen  # noqa: F401
+from ._simulator import SimulationState as SimulationState  # noqa: F401
+from ._simulator import SimulatorSource as SimulatorSource  # noqa: F401
+from ._source import CameraSource as CameraSource  # noqa: F401
+from ._source import FrameSource as FrameSource  # noqa: F401
+from ._source import ReplaySource as ReplaySource  # noqa: F401
+from ._template import Match as Match
+from ._template import Template as Template
+from ._timing import Clock as Clock
+from ._timing import JitterStats
+from ._timing import SYSTEM_CLOCK as SYSTEM_CLOCK  # noqa: F401
+from ._timing import SystemClock as SystemClock  # noqa: F401
+from ._timing import Timeline
+from ._timing import VirtualClock as VirtualClock  # noqa: F401
+from ._watch import Watch as Watch
+from ._watch import WatchEvent as WatchEvent
 from .db import DB as DB  # noqa: F401
 from .exceptions import ExecCrash as ExecCrash  # noqa: F401
 from .exceptions import ExecLock as ExecLock
@@ -37,7 +72,7 @@ from .notify import Telegram
 
 
 @contextlib.contextmanager
-def shh(ser: serial.Serial) -> Generator[None, None, None]:
+def shh(ser: SerialWriter) -> Generator[None, None, None]:
 	try: yield
 	finally: ser.write(b'.')
 
@@ -68,15 +103,37 @@ class RequirementsAction(argparse.Action):
 
 ScriptT = TypeVar("ScriptT")
 
+# pause after releasing a button, so consecutive presses register as such
+_RELEASE_PAUSE = 0.075
+# waits that read frames stop doing so this long before their deadline, the rest is slept precisely
+_RENDER_MARGIN_NS = 3_000_000
+
 
 class Script(Generic[ScriptT]):
-	def __init__(self, ser: serial.Serial, cap: Capture, config: dict[str, Any], **kwargs) -> None:
+	def __init__(self, ser: SerialWriter, cap: Capture, config: dict[str, Any], **kwargs) -> None:
 		self._ser = ser
 		self._cap: Capture = cap
+		# everything is timed on the clock of the capture
+		self._clock: Clock = cap.clock
 
 		self.windowName: Final = str(kwargs.pop("windowName", "Game"))
 
 		self.renderCapture: Final = bool(config.pop("renderCapture", True))
+		previewFps = float(config.pop("previewFps", 15))
+		previewScale = float(config.pop("previewScale", 1.0))
+
+		self._lastFrameId = 0
+
+		# presses and waits are scheduled back to back on absolute deadlines
+		self._timeline = Timeline(clock=self._clock)
+		self._jitter = JitterStats()
+
+		# signature, fingerprint and distances of the last check, reused while the content doesn't change
+		self._lastCheck: Optional[tuple[ScreenSignature, int, numpy.ndarray]] = None
+		self._checks = 0
+		self._skippedChecks = 0
+
+		self._preview = cap.startPreview(self.windowName, fps=previewFps, scale=previewScale) if self.renderCapture is True else None
 
 		self.notifier = Notifier()
 
@@ -103,18 +160,24 @@ class Script(Generic[ScriptT]):
 		return self.main(e)
 
 	def __del__(self):
+		self._cap.stopPreview()
 		self._ser.close()
 		del self._ser
 		del self._cap
 
 	@property
 	def extraStats(self) -> tuple[tuple[str, Any], ...]:
-		return tuple()
+		return (("Skipped checks", f"{self._skippedChecks}/{self._checks}"),) + self._jitter.stats() + self._ser.stats()
 
 	@abstractmethod
 	def main(self, e: int) -> ScriptT:
 		raise NotImplementedError
 
+	@final
+	@property
+	def clock(self) -> Clock:
+		return self._clock
+
 	@final
 	def log(self, level: int, msg: str) -> None:
 		log(level, msg)
@@ -134,38 +197,74 @@ class Script(Generic[ScriptT]):
 	@final
 	def getframe(self) -> Frame:
 		frame = self._cap.read()
+		self._lastFrameId = frame.id
+
+		self._checkStop()
+		return frame
+
+	@final
+	def getnextframe(self, timeout: float = 1.0) -> Frame:
+		"""
+		wait for a frame that was not returned by `getframe`/`getnextframe` yet
 
-		if self.renderCapture is True:
-			cv2.imshow(self.windowName, frame.ndarray)
+		@param timeout max time to wait; the latest (already seen) frame is returned after that
+		"""
+		frame = self._cap.readNext(self._lastFrameId, timeout)
+		self._lastFrameId = frame.id
 
-		if cv2.waitKey(1) & 0xFF == ord("q"):
+		self._checkStop()
+		return frame
+
+	@final
+	def _checkStop(self) -> None:
+		if self._preview is None:
+			return
+
+		# renders here, on the main thread, where the GUI can't run on another one
+		self._preview.poll()
+		# 'q' in the preview window
+		if self._preview.stopRequested is True:
 			raise ExecStop
-		else:
-			return frame
 
 	@final
 	def idle(self) -> None:
 		self._ser.write(b"0")
 		try:
 			while True:
-				self.getframe()
+				self.getnextframe()
 		except KeyboardInterrupt:
 			pass
 
+	@final
+	def _waitUntil(self, deadline: int, render: bool) -> int:
+		"""
+		@param render keep reading frames until shortly before `deadline`
+		@return how late it returned (ns)
+		"""
+		if render is True:
+			while (left := deadline - self._clock.now()) > _RENDER_MARGIN_NS:
+				self.getnextframe((left - _RENDER_MARGIN_NS) / 1e9)
+		return self._clock.sleepUntil(deadline)
+
 	@final
 	def press(self, button: Button, duration: float = 0.05, render: bool = False) -> None:
 		self.logTrace(f"press {button=} | {duration=}s")
 
+		# continues right where the previous press or wait ended, if it follows it directly
+		tPress, tRelease = self._timeline.schedule(duration)
+
+		self._jitter.record(self._clock.sleepUntil(tPress))
+		pressedAt = self._clock.now()
 		self._ser.write(button.encode())
-		if render is True or duration >= 0.5:
-			tEnd = time.time() + duration
-			while time.time() < tEnd:
-				self.getframe()
-		else:
-			time.sleep(duration)
 
+		# a slot that caught up started in the past, but the button is still held for all of `duration`;
+		# only the gaps between presses catch up
+		tRelease = max(tRelease, pressedAt + round(duration * 1e9))
+		self._jitter.record(self._waitUntil(tRelease, render is True or duration >= 0.5))
 		self._ser.write(b"0")
-		time.sleep(0.075)
+
+		_, tEnd = self._timeline.schedule(_RELEASE_PAUSE)
+		self._clock.sleepUntil(tEnd)
 
 	@final
 	def pressN(self, button: Button, n: int, delay: float, duration: float = 0.05, render: bool = False) -> None:
@@ -173,17 +272,37 @@ class Script(Generic[ScriptT]):
 
 		for _ in range(n):
 			self.press(button, duration, render)
-			if render is True:
-				self.waitAndRender(delay)
-			else:
-				time.sleep(delay)
+			_, tEnd = self._timeline.schedule(delay)
+			self._waitUntil(tEnd, render)
+
+	@final
+	def playMacro(self, macro: Macro) -> MacroHandle:
+		"""
+		start playing `macro` in the background, right after the previous press or wait if it follows it directly
+
+		nothing else may be pressed until it is done (or cancelled)
+		"""
+		self.logTrace(f"playMacro {macro} | {macro.duration:.3f}s")
+		tStart, _ = self._timeline.schedule(macro.duration)
+		return MacroHandle(macro, self._ser.write, tStart, self._jitter, clock=self._clock)
+
+	@final
+	def runMacro(self, macro: Macro) -> None:
+		"""play `macro` and keep reading frames until it is done"""
+		handle = self.playMacro(macro)
+		try:
+			while (left := handle.end - self._clock.now()) > _RENDER_MARGIN_NS:
+				self.getnextframe((left - _RENDER_MARGIN_NS) / 1e9)
+			handle.wait()
+		finally:
+			# e.g. on ExecStop
+			handle.cancel()
 
 	@final
 	def waitAndRender(self, duration: float) -> None:
 		self.logTrace(f"waitAndRender {duration=}")
-		tEnd = time.time() + duration
-		while time.time() < tEnd:
-			self.getframe()
+		_, tEnd = self._timeline.schedule(duration)
+		self._waitUntil(tEnd, True)
 
 	@final
 	def alarm(self) -> None:
@@ -194,178 +313,313 @@ class Script(Generic[ScriptT]):
 			self.waitAndRender(0.4)
 
 	@final
-	def nearColor(self, current: Color, expected: Color, distance: int = 75) -> bool:
-		return current.distance(expected) <= distance
+	def measureLatency(self, button: Button, pos: Pos, distance: int = 75, timeout: float = 5) -> Optional[float]:
+		"""
+		press `button` and measure how long it takes until the color at `pos` changes
+
+		covers the whole chain (serial, console, capture card, driver buffers, decoding)
+
+		@return latency in seconds, or None if nothing changed within `timeout`
+		"""
+		before = self.getframe().colorAt(pos)
+		watch = self._cap.watch(lambda f: f.colorAt(pos).distance(before) > distance)
+		try:
+			tPress = self._clock.now()
+			self.press(button)
+			event = self.awaitWatch(watch, True, timeout)
+		finally:
+			self._cap.unwatch(watch)
+
+		if event is None:
+			return None
+		return (event.timestamp - tPress) / 1e9
+
+	@final
+	def nearColor(self, current: Color, expected: Color, distance: int = 75, metric: Metric = Metric.RGB) -> bool:
+		return current.distance(expected, metric) <= distance
 
 	@final
-	def awaitColor(self, pos: Pos, color: Color, timeout: float = 90) -> None:
-		tEnd = time.time() + timeout
-		while (frame := self.getframe()).colorAt(pos) != color:
-			if time.time() > tEnd:
-				raise ExecLock(
-					f"did not find color ({color}) at ({pos});"
-					f"color in last frame: {frame.colorAt(pos)}",
-				)
+	@contextlib.contextmanager
+	def measureMotion(self, detector: MotionDetector) -> Generator[MotionDetector, None, None]:
+		"""
+		feed every captured frame to `detector` (after resetting it) while the block runs
+		"""
+		detector.reset()
+		watch = self._cap.watch(detector)
+		try:
+			yield detector
+		finally:
+			self._cap.unwatch(watch)
 
 	@final
-	def awaitNotColor(self, pos: Pos, color: Color, timeout: float = 90) -> None:
-		tEnd = time.time() + timeout
-		while self.getframe().colorAt(pos) == color:
-			if time.time() > tEnd:
-				raise ExecLock(f"did not find not color ({color}) at ({pos})")
+	def awaitWatch(self, watch: Watch, state: bool, timeout: float = 90, trace: Optional[Callable[[Frame], None]] = None) -> Optional[WatchEvent]:
+		"""
+		wait until `watch` reports `state`
+
+		edges are detected by the capture thread, so even a frame the script never
+		got to see (e.g. because rendering or logging slowed it down) is caught
+
+		@param trace called with every frame the script reads meanwhile (e.g. to trace what `watch` looks at)
+		@return the event (with the id and timestamp of the frame that caused it), or None on timeout
+		"""
+		tEnd = self._clock.time() + timeout
+		while True:
+			while (event := watch.poll()) is not None:
+				if event.state is state:
+					return event
+			if (t := self._clock.time()) >= tEnd:
+				return None
+			frame = self.getnextframe(min(1.0, tEnd - t))
+			if trace is not None:
+				trace(frame)
 
 	@final
-	def awaitColors(self, colors: tuple[tuple[Pos, Color], ...], timeout: float = 90) -> None:
+	def awaitAny(self, predicates: dict[str, Callable[[Frame], bool]], timeout: float = 90) -> Optional[tuple[str, Frame]]:
+		"""
+		evaluate all `predicates` (in order) against every new frame until one of them holds
+
+		@return name of the first predicate that held and the frame it held on, or None on timeout
+		"""
 		frame = self.getframe()
-		tEnd = time.time() + timeout
+		tEnd = self._clock.time() + timeout
+		fingerprint: Optional[int] = None
+
+		while True:
+			self._checks += len(predicates)
+			if frame.fingerprint == fingerprint:
+				# none of them held for this content already
+				self._skippedChecks += len(predicates)
+			else:
+				fingerprint = frame.fingerprint
+				for name, predicate in predicates.items():
+					if predicate(frame):
+						return name, frame
 
-		while not all(map(lambda c: frame.colorAt(c[0]) == c[1], colors)):
-			for _pos, _c in colors:
-				_color = frame.colorAt(_pos)
-				_distance = _color.distance(_c)
-				self.logTrace(f"Pos: {str(_pos):<12} | Color: {str(_color):<16} | Distance: {_distance}")
-			if time.time() > tEnd:
-				raise ExecLock(f"did not find colors ({(f'{c} at {p}' for p, c in colors)})")
-			frame = self.getframe()
+			if (t := self._clock.time()) >= tEnd:
+				return None
+			frame = self.getnextframe(min(1.0, tEnd - t))
 
 	@final
-	def awaitNotColors(self, colors: tuple[tuple[Pos, Color], ...], timeout: float = 90) -> None:
-		frame = self.getframe()
-		tEnd = time.time() + timeout
+	def _distances(self, signature: ScreenSignature, frame: Frame) -> numpy.ndarray:
+		"""
+		distances of `frame` to `signature`, reused (and not traced again) if the content
+		didn't change since the last check of the same signature
+		"""
+		self._checks += 1
+		if (last := self._lastCheck) is not None and last[0] is signature and last[1] == frame.fingerprint:
+			self._skippedChecks += 1
+			return last[2]
+
+		distances = signature.distances(frame)
+		self._lastCheck = (signature, frame.fingerprint, distances)
+		self._traceSignature(frame, signature, distances)
+		return distances
 
-		while any(map(lambda c: frame.colorAt(c[0]) == c[1], colors)):
-			if time.time() > tEnd:
-				raise ExecLock
-			frame = self.getframe()
+	@final
+	def _traceSignature(self, frame: Frame, signature: ScreenSignature, distances: numpy.ndarray) -> None:
+		for (_pos, _), _color, _distance in zip(signature.probes, frame.colorsAt(signature.probes).tolist(), distances.tolist()):
+			self.logTrace(f"Pos: {str(_pos):<12} | Color: {str(Color(*_color)):<16} | Distance: {_distance}")
 
 	@final
-	def awaitFlash(self, pos: Pos, color: Color, timeout: float = 90) -> None:
-		self.awaitColor(pos, color, timeout)
-		self.awaitNotColor(pos, color, timeout)
+	def _traceWatch(self, signature: ScreenSignature) -> Callable[[Frame], None]:
+		return lambda frame: self._traceSignature(frame, signature, signature.distances(frame))
 
 	@final
-	def awaitNearColor(self, pos: Pos, color: Color, distance: int = 75, timeout: float = 90) -> None:
-		tEnd = time.time() + timeout
-		while not self.nearColor((frame := self.getframe()).colorAt(pos), color, distance):
-			self.logTrace(f"Pos: {str(pos):<12} | Color: {str((_color := frame.colorAt(pos))):<16} | Distance {_color.distance(color)}")
-			if time.time() > tEnd:
-				raise ExecLock(
-					f"did not find near color ({color}) at ({pos}) (distance: {distance});"
-					f"color in last frame: {frame.colorAt(pos)} (distance: {frame.colorAt(pos).distance(color)})",
-				)
+	def _lastColors(self, frame: Frame, signature: ScreenSignature) -> str:
+		return ", ".join(str(Color(*c)) for c in frame.colorsAt(signature.probes).tolist())
 
 	@final
-	def awaitNotNearColor(self, pos: Pos, color: Color, distance: int = 75, timeout: float = 90) -> None:
-		tEnd = time.time() + timeout
-		while self.nearColor((frame := self.getframe()).colorAt(pos), color, distance):
-			if time.time() > tEnd:
-				raise ExecLock(
-					f"did not find not near color ({color}) at ({pos}) (distance: {distance});"
-					f"color in last frame: {frame.colorAt(pos)} (distance: {frame.colorAt(pos).distance(color)})",
-				)
+	def awaitSignature(self, signature: ScreenSignature, timeout: float = 90) -> Frame:
+		"""
+		@return the first frame matching `signature`
+		"""
+		frame = self.getframe()
+		tEnd = self._clock.time() + timeout
+
+		while not signature.matches(self._distances(signature, frame)):
+			if self._clock.time() > tEnd:
+				raise ExecLock(f"did not find {signature}; colors in last frame: {self._lastColors(frame, signature)}")
+			frame = self.getnextframe()
+
+		return frame
 
 	@final
-	def awaitNearColors(self, colors: tuple[tuple[Pos, Color], ...], distance: int = 75, timeout: float = 90) -> None:
+	def awaitTemplate(self, template: Template, timeout: float = 90) -> Match:
+		"""
+		@return where `template` was found first
+		"""
 		frame = self.getframe()
-		tEnd = time.time() + timeout
+		tEnd = self._clock.time() + timeout
 
-		while not all(map(lambda c: self.nearColor(frame.colorAt(c[0]), c[1], distance), colors)):
-			for _pos, _c in colors:
-				_color = frame.colorAt(_pos)
-				_distance = _color.distance(_c)
-				self.logTrace(f"Pos: {str(_pos):<12} | Color: {str(_color):<16} | Distance: {_distance}")
-			if time.time() > tEnd:
-				raise ExecLock(f"did not find near colors ({', '.join(f'{c} at {p}' for p, c in colors)}) (distance: {distance})")
-			frame = self.getframe()
+		while (match := frame.find(template)) is None:
+			if self._clock.time() > tEnd:
+				raise ExecLock(f"did not find {template}; best match in last frame: {template.search(frame.ndarray)}")
+			frame = self.getnextframe()
+
+		return match
 
 	@final
-	def whileColor(self, pos: Pos, color: Color, delay: float, fn: Callable[[], None], timeout: float = 90) -> None:
-		tEnd = time.time()
-		tStop = time.time() + timeout
-		while (frame := self.getframe()).colorAt(pos) == color.tpl:
-			if (t := time.time()) > tEnd:
+	def awaitNotSignature(self, signature: ScreenSignature, timeout: float = 90) -> Frame:
+		"""
+		@return the first frame not matching `signature`
+		"""
+		frame = self.getframe()
+		tEnd = self._clock.time() + timeout
+
+		while signature.matches(self._distances(signature, frame)):
+			if self._clock.time() > tEnd:
+				raise ExecLock(f"did not find not {signature}; colors in last frame: {self._lastColors(frame, signature)}")
+			frame = self.getnextframe()
+
+		return frame
+
+	@final
+	def whileSignature(self, signature: ScreenSignature, delay: float, fn: Callable[[], None], timeout: float = 90) -> Frame:
+		"""
+		call `fn` every `delay` seconds while frames match `signature`
+
+		@return the first frame not matching `signature`
+		"""
+		return self._whileSignature(signature, True, delay, fn, timeout)
+
+	@final
+	def whileNotSignature(self, signature: ScreenSignature, delay: float, fn: Callable[[], None], timeout: float = 90) -> Frame:
+		"""
+		call `fn` every `delay` seconds until a frame matches `signature`
+
+		@return the first frame matching `signature`
+		"""
+		return self._whileSignature(signature, False, delay, fn, timeout)
+
+	@final
+	def _whileSignature(self, signature: ScreenSignature, state: bool, delay: float, fn: Callable[[], None], timeout: float) -> Frame:
+		frame = self.getframe()
+
+		tStep = self._clock.time()
+		tTimeout = self._clock.time() + timeout
+
+		while signature.matches(self._distances(signature, frame)) is state:
+
+			if (t := self._clock.time()) > tTimeout:
+				raise ExecLock(f"did not find {'not ' if state else ''}{signature}; colors in last frame: {self._lastColors(frame, signature)}")
+			elif t > tStep:
 				fn()
-				tEnd = time.time() + delay
-			elif t > tStop:
+				tStep = self._clock.time() + delay
+
+			frame = self.getnextframe()
+
+		return frame
+
+	@final
+	def awaitColor(self, pos: Pos, color: Color, timeout: float = 90) -> None:
+		signature = ScreenSignature(((pos, color),))
+		watch = self._cap.watch(signature)
+		try:
+			if self.awaitWatch(watch, True, timeout, self._traceWatch(signature)) is None:
 				raise ExecLock(
 					f"did not find color ({color}) at ({pos});"
-					f"color in last frame: {frame.colorAt(pos)}",
+					f"color in last frame: {self.getframe().colorAt(pos)}",
 				)
+		finally:
+			self._cap.unwatch(watch)
 
 	@final
-	def whileNotColor(self, pos: Pos, color: Color, delay: float, fn: Callable[[], None], timeout: float = 90) -> None:
-		tEnd = time.time()
-		tStop = time.time() + timeout
-		while self.getframe().colorAt(pos) != color.tpl:
-			if (t := time.time()) > tEnd:
-				fn()
-				tEnd = time.time() + delay
-			elif t > tStop:
+	def awaitNotColor(self, pos: Pos, color: Color, timeout: float = 90) -> None:
+		signature = ScreenSignature(((pos, color),))
+		watch = self._cap.watch(signature)
+		try:
+			if self.awaitWatch(watch, False, timeout, self._traceWatch(signature)) is None:
 				raise ExecLock(f"did not find not color ({color}) at ({pos})")
+		finally:
+			self._cap.unwatch(watch)
 
 	@final
-	def whileColors(self, colors: tuple[tuple[Pos, Color], ...], delay: float, fn: Callable[[], None], timeout: float = 90) -> None:
-		frame = self.getframe()
+	def awaitColors(self, colors: tuple[tuple[Pos, Color], ...], timeout: float = 90) -> None:
+		self.awaitSignature(ScreenSignature(colors), timeout)
+
+	@final
+	def awaitNotColors(self, colors: tuple[tuple[Pos, Color], ...], timeout: float = 90) -> None:
+		# none of the colors may be left
+		self.awaitNotSignature(ScreenSignature(colors, quorum=1), timeout)
 
-		t = time.time()
-		tStep = time.time()
-		tTimeout = time.time() + timeout
+	@final
+	def awaitFlash(self, pos: Pos, color: Color, timeout: float = 90) -> None:
+		# one watch for both edges, so a flash shorter than a loop iteration is still seen
+		signature = ScreenSignature(((pos, color),))
+		watch = self._cap.watch(signature)
+		try:
+			if self.awaitWatch(watch, True, timeout, self._traceWatch(signature)) is None:
+				raise ExecLock(f"did not find color ({color}) at ({pos})")
+			if self.awaitWatch(watch, False, timeout, self._traceWatch(signature)) is None:
+				raise ExecLock(f"did not find not color ({color}) at ({pos})")
+		finally:
+			self._cap.unwatch(watch)
 
-		while all(map(lambda c: frame.colorAt(c[0]) == c[1], colors)):
-			for _pos, _c in colors:
-				self.logTrace(f"Pos: {str(_pos):<12} | Color: {str(_color := frame.colorAt(_pos)):<16} | Distance: {_color.distance(_c)}")
+	@final
+	def awaitNearColor(
+		self,
+		pos: Pos,
+		color: Color,
+		distance: int = 75,
+		timeout: float = 90,
+		*,
+		radius: int = 0,
+		metric: Metric = Metric.RGB,
+	) -> None:
+		"""
+		@param radius compare the mean color of the patch around `pos` instead of a single pixel (robust to noise and scaling)
+		@param metric color space `distance` is measured in
+		"""
+		self.awaitSignature(ScreenSignature(((pos, color),), tolerance=distance, radius=radius, metric=metric), timeout)
 
-			if (t := time.time()) > tTimeout:
-				raise ExecLock(f"did not find colors ({', '.join(f'{c} at {p}' for p, c in colors)})")
-			elif t > tStep:
-				fn()
-				tStep = time.time() + delay
+	@final
+	def awaitNotNearColor(
+		self,
+		pos: Pos,
+		color: Color,
+		distance: int = 75,
+		timeout: float = 90,
+		*,
+		radius: int = 0,
+		metric: Metric = Metric.RGB,
+	) -> None:
+		self.awaitNotSignature(ScreenSignature(((pos, color),), tolerance=distance, radius=radius, metric=metric), timeout)
 
 	@final
-	def whileNotColors(self, colors: tuple[tuple[Pos, Color], ...], delay: float, fn: Callable[[], None], timeout: float = 90) -> None:
-		frame = self.getframe()
+	def awaitNearColors(
+		self,
+		colors: tuple[tuple[Pos, Color], ...],
+		distance: int = 75,
+		timeout: float = 90,
+		*,
+		radius: int = 0,
+		metric: Metric = Metric.RGB,
+	) -> None:
+		self.awaitSignature(ScreenSignature(colors, tolerance=distance, radius=radius, metric=metric), timeout)
+
+	@final
+	def whileColor(self, pos: Pos, color: Color, delay: float, fn: Callable[[], None], timeout: float = 90) -> None:
+		self.whileSignature(ScreenSignature(((pos, color),)), delay, fn, timeout)
 
-		t = time.time()
-		tStep = time.time()
-		tTimeout = time.time() + timeout
+	@final
+	def whileNotColor(self, pos: Pos, color: Color, delay: float, fn: Callable[[], None], timeout: float = 90) -> None:
+		self.whileNotSignature(ScreenSignature(((pos, color),)), delay, fn, timeout)
 
-		while not all(map(lambda c: frame.colorAt(c[0]) == c[1], colors)):
-			for _pos, _c in colors:
-				self.logTrace(f"Pos: {str(_pos):<12} | Color: {str(_color := frame.colorAt(_pos)):<16} | Distance: {_color.distance(_c)}")
+	@final
+	def whileColors(self, colors: tuple[tuple[Pos, Color], ...], delay: float, fn: Callable[[], None], timeout: float = 90) -> None:
+		self.whileSignature(ScreenSignature(colors), delay, fn, timeout)
 
-			if (t := time.time()) > tTimeout:
-				raise ExecLock(f"did not find not colors ({', '.join(f'{c} at {p}' for p, c in colors)})")
-			elif t > tStep:
-				fn()
-				tStep = time.time() + delay
+	@final
+	def whileNotColors(self, colors: tuple[tuple[Pos, Color], ...], delay: float, fn: Callable[[], None], timeout: float = 90) -> None:
+		self.whileNotSignature(ScreenSignature(colors), delay, fn, timeout)
 
 	@final
 	def whileNearColor(self, pos: Pos, color: Color, distance: int, delay: float, fn: Callable[[], None], timeout: float = 90) -> None:
-		tEnd = time.time()
-		tStop = time.time() + timeout
-		while self.nearColor((frame := self.getframe()).colorAt(pos), color, distance):
-			if (t := time.time()) > tEnd:
-				fn()
-				tEnd = time.time() + delay
-			elif t > tStop:
-				raise ExecLock(
-					f"did not find near color ({color}) at ({pos}) (distance: {distance});"
-					f" color in last frame: {frame.colorAt(pos)} (distance: {sum((c2 - c1) ** 2 for c1, c2 in zip(frame.colorAt(pos), color.tpl))})",
-				)
+		self.whileSignature(ScreenSignature(((pos, color),), tolerance=distance), delay, fn, timeout)
 
 	@final
 	def whileNotNearColor(self, pos: Pos, color: Color, distance: int, delay: float, fn: Callable[[], None], timeout: float = 90) -> None:
-		tEnd = time.time()
-		tStop = time.time() + timeout
-		while not self.nearColor((frame := self.getframe()).colorAt(pos), color, distance):
-			if (t := time.time()) > tEnd:
-				fn()
-				tEnd = time.time() + delay
-			elif t > tStop:
-				raise ExecLock(
-					f"did not find not near color ({color}) as ({pos}) (distance: {distance});"
-					f" color in last frame: {frame.colorAt(pos)} (distance: {sum((c2 - c1) ** 2 for c1, c2 in zip(frame.colorAt(pos), color.tpl))})",
-				)
+		self.whileNotSignature(ScreenSignature(((pos, color),), tolerance=distance), delay, fn, timeout)
 
 	@final
 	def resetGame(self) -> None:
@@ -0,0 +1,176 @@
+import logging
+import os
+import time
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory
+from typing import Any
+from typing import final
+from typing import Optional
+
+import numpy
+
+from ._logging import log
+from ._source import FrameSource
+from ._timing import now
+
+
+# header layout (int64 each)
+_H_SLOTS = 0
+_H_HEIGHT = 1
+_H_WIDTH = 2
+_H_FPS_MILLI = 3
+_H_LATEST = 4
+_H_SIZE = 8
+
+# per slot: sequence number of the frame in it (-1 while it is being written), time it was captured (see `_timing.now`, which is the same in every process)
+_M_SEQ = 0
+_M_TIMESTAMP = 1
+_M_SIZE = 2
+
+_INT64 = numpy.dtype(numpy.int64).itemsize
+
+
+def _layout(buf: memoryview, slots: int, height: int, width: int) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+	header = numpy.ndarray((_H_SIZE,), dtype=numpy.int64, buffer=buf)
+	meta = numpy.ndarray((slots, _M_SIZE), dtype=numpy.int64, buffer=buf, offset=_H_SIZE * _INT64)
+	frames = numpy.ndarray((slots, height, width, 3), dtype=numpy.uint8, buffer=buf, offset=(_H_SIZE + slots * _M_SIZE) * _INT64)
+	return header, meta, frames
+
+
+@final
+class Broker:
+	def __init__(self, name: str, source: FrameSource, width: int, height: int, *, slots: int = 4) -> None:
+		"""
+		owns `source` and publishes its frames into the shared memory block `name`
+
+		@param name name of the shared memory block clients attach to
+		@param source where to read frames from
+		@param width width of the frames
+		@param height height of the frames
+		@param slots amount of frames kept in the shared ring
+		"""
+
+		self._source = source
+		self._slots = slots
+
+		size = (_H_SIZE + slots * _M_SIZE) * _INT64 + slots * height * width * 3
+		self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+		self._header, self._meta, self._frames = _layout(self._shm.buf, slots, height, width)
+
+		self._meta[:] = -1
+		self._header[:] = (slots, height, width, round(source.fps * 1000), 0, 0, 0, 0)
+
+		self._failures = 0
+
+	def close(self) -> None:
+		del self._header, self._meta, self._frames
+		self._shm.close()
+		self._shm.unlink()
+		self._source.release()
+
+	@property
+	def published(self) -> int:
+		return int(self._header[_H_LATEST])
+
+	@property
+	def failures(self) -> int:
+		return self._failures
+
+	def publishNext(self) -> bool:
+		seq = self.published + 1
+		slot = seq % self._slots
+
+		out = self._frames[slot]
+
+		# seqlock: clients discard a slot whose sequence number changed while they copied it
+		self._meta[slot, _M_SEQ] = -1
+		ok, frame = self._source.read(out)
+		timestamp = now()
+		if ok is False:
+			self._failures += 1
+			return False
+		elif frame is not out:
+			if frame.shape != out.shape:
+				self._failures += 1
+				log(logging.WARNING, f"dropping frame of shape {frame.shape}, broker was set up for {out.shape}")
+				return False
+			numpy.copyto(out, frame)
+
+		# the sequence number last, it validates the timestamp too
+		self._meta[slot, _M_TIMESTAMP] = timestamp
+		self._meta[slot, _M_SEQ] = seq
+		self._header[_H_LATEST] = seq
+		return True
+
+
+@final
+class BrokerSource(FrameSource):
+	def __init__(self, name: str, *, timeout: float = 1.0) -> None:
+		"""
+		reads the frames published by a `Broker` running in another process
+
+		@param name name of the broker's shared memory block
+		@param timeout time without a new frame after which a read fails
+		"""
+
+		self._shm = shared_memory.SharedMemory(name=name)
+		if os.name == "posix":
+			# attaching registers the block with this process' resource tracker, which would unlink it on exit
+			resource_tracker.unregister(self._shm._name, "shared_memory")  # type: ignore[attr-defined]
+
+		header = numpy.ndarray((_H_SIZE,), dtype=numpy.int64, buffer=self._shm.buf)
+		slots, height, width = (int(v) for v in header[:_H_WIDTH + 1])
+		self._fps = header[_H_FPS_MILLI] / 1000
+		self._header, self._meta, self._frames = _layout(self._shm.buf, slots, height, width)
+
+		self._slots = slots
+		self._timeout = timeout
+		self._lastSeq = int(self._header[_H_LATEST])
+		self._timestamp: Optional[int] = None
+
+		self._torn = 0
+		self._skipped = 0
+
+	def read(self, out: numpy.ndarray) -> tuple[bool, numpy.ndarray]:
+		if out.shape != self._frames.shape[1:]:
+			out = numpy.empty(self._frames.shape[1:], dtype=numpy.uint8)
+
+		tEnd = time.monotonic() + self._timeout
+		while time.monotonic() < tEnd:
+			if (seq := int(self._header[_H_LATEST])) <= self._lastSeq:
+				time.sleep(0.001)
+				continue
+
+			slot = seq % self._slots
+			if self._meta[slot, _M_SEQ] != seq:
+				continue
+			numpy.copyto(out, self._frames[slot])
+			timestamp = int(self._meta[slot, _M_TIMESTAMP])
+			if self._meta[slot, _M_SEQ] != seq:
+				# overwritten while copying
+				self._torn += 1
+				continue
+
+			self._timestamp = timestamp
+			self._skipped += seq - self._lastSeq - 1
+			self._lastSeq = seq
+			return True, out
+
+		return False, out
+
+	def release(self) -> None:
+		del self._header, self._meta, self._frames
+		self._shm.close()
+
+	@property
+	def fps(self) -> float:
+		return self._fps
+
+	@property
+	def timestamp(self) -> Optional[int]:
+		return self._timestamp
+
+	def stats(self) -> tuple[tuple[str, Any], ...]:
+		return (
+			("Broker frames (skipped/torn)", f"{self._lastSeq} ({self._skipped}/{self._torn})"),
+		)
@@ -1,86 +1,179 @@
+import collections
 import logging
+import pathlib
 import threading
 from threading import Thread
+from typing import Any
+from typing import Callable
 from typing import final
+from typing import Optional
 
-import cv2
 import numpy
 
+from ._clip import ClipBuffer
 from ._frame import Frame
 from ._logging import log
+from ._preview import Preview
+from ._recorder import DropPolicy
+from ._recorder import Recorder
+from ._source import CameraSource
+from ._source import FrameSource
+from ._timing import Clock
+from ._timing import SYSTEM_CLOCK
+from ._watch import Watch
 
 
 _THREAD_VIDCAP = "Thread-VideoCapture_update"
-_THREAD_VIDWRITE = "Thread-VideoWriter"
+
+# amount of frames the effective fps is averaged over
+_FPS_WINDOW = 60
 
 
 @final
 class Capture:
-	def __init__(self, *, camID: int = 0, width: int = 768, height: int = 480, fps: int = 30) -> None:
+	def __init__(self, *, camID: int = 0, width: int = 768, height: int = 480, fps: int = 30, ringSize: int = 4, source: Optional[FrameSource] = None, clipSeconds: float = 0, lowLatency: bool = False, clock: Clock = SYSTEM_CLOCK) -> None:
 		"""
-		@param camID camera ID to read
+		@param camID camera ID to read (ignored if `source` is set)
 		@param width width of capture
 		@param height height of capture
 		@param fps fps of capture
+		@param ringSize amount of preallocated frame slots; a frame handed out by `read` stays valid for `ringSize - 1` further captured frames
+		@param source where to read frames from (defaults to the camera `camID`)
+		@param clipSeconds keep the last `clipSeconds` seconds in memory for `dumpClip` (disabled if 0)
+		@param lowLatency always return the newest frame of the camera, skipping buffered ones (ignored if `source` is set)
+		@param clock frames are timestamped and waited for in (a `VirtualClock` needs a `source` pacing itself on it)
 		"""
 
+		if ringSize < 2:
+			raise ValueError(f"ringSize must be at least 2 (got {ringSize})")
+
 		self._width = width
 		self._height = height
 		self._fps = fps
-
-		self._isCapturing = False
-
-		self.vid = self._setupCapture(camID)
-
-		_, f = self.vid.read()
-		self._frame: numpy.ndarray = f
-
-		self._writeThread: Thread
-
-		self._frameLock = threading.Lock()
+		self._clock = clock
+
+		self._recorder: Optional[Recorder] = None
+		self._preview: Optional[Preview] = None
+		self._watches: tuple[Watch, ...] = ()
+		# held while watches are evaluated and the frame is published, so a new watch starts on the published frame and misses none after it
+		self._watchLock = threading.Lock()
+
+		self._source: FrameSource = source or CameraSource(camID, width, height, fps, lowLatency=lowLatency)
+
+		self._readFailures = 0
+		self._duplicateReads = 0
+		self._lastReadId = 0
+		self._nReads = 0
+		self._ageSum = 0
+		self._ageMax = 0
+		self._unchangedFrames = 0
+		self._watchEvals = 0
+		self._watchSkips = 0
+		self._timestamps: collections.deque[int] = collections.deque(maxlen=_FPS_WINDOW)
+
+		self._ring: list[numpy.ndarray] = [numpy.zeros((height, width, 3), dtype=numpy.uint8) for _ in range(ringSize)]
+		self._ringIdx = 0
+		self._frameId = 0
+		self._decode(0)
+		self._frame: Frame = self._publish(0)
+
+		self._frameCond = threading.Condition()
 		self._doRead = True
 		self._readThread = Thread(target=self._update, name=_THREAD_VIDCAP, daemon=True)
+		clock.attach(self._readThread)
 		self._readThread.start()
 
+		self._clip = ClipBuffer(self._waitNext, clipSeconds, self._source.fps) if clipSeconds > 0 else None
+
 	def __del__(self):
 		self._doRead = False
 
-		if self.vid.isOpened():
-			self.vid.release()
+		if self._clip is not None:
+			self._clip.stop()
 
-		if self._isCapturing is True:
+		self.stopPreview()
+
+		if self._recorder is not None:
 			log(logging.DEBUG, "Stopping running capture")
 			self.stopCapture()
 
-		log(logging.DEBUG, "Waiting for VideoCapture thread to stop...")
-		self._readThread.join()
-
-	def _setupCapture(self, id: int) -> cv2.VideoCapture:
-		vid = cv2.VideoCapture(id)
-		vid.set(cv2.CAP_PROP_FPS, self._fps)
-		vid.set(cv2.CAP_PROP_FRAME_WIDTH, self._width)
-		vid.set(cv2.CAP_PROP_FRAME_HEIGHT, self._height)
+		# the last reference may be dropped by the capture thread itself once its source is exhausted
+		if self._readThread is not threading.current_thread():
+			log(logging.DEBUG, "Waiting for VideoCapture thread to stop...")
+			self._readThread.join()
 
-		return vid
+		# only once nothing reads from it anymore, a shared memory source can't be closed while a frame is copied out of it
+		self._source.release()
 
 	def _update(self) -> None:
 		log(logging.DEBUG, f"{_THREAD_VIDCAP} is running")
 
-		ok, frame = self.vid.read()
-
 		try:
 			while self._doRead is True:
-				ok, frame = self.vid.read()
-				with self._frameLock:
-					if ok is True:
-						self._frame = frame
-					else:
-						log(logging.WARNING, "Failed to read from VideoCapture")
+				# decode into the slot after the published one; readers only ever see published slots
+				idx = (self._ringIdx + 1) % len(self._ring)
+				if self._decode(idx) is True:
+					frame = self._publish(idx)
+					# fingerprint is computed here once, before readers can see the frame
+					if frame.fingerprint == self._frame.fingerprint:
+						self._unchangedFrames += 1
+
+					failed: list[Watch] = []
+					with self._watchLock:
+						# before publishing, so the events of a frame are there once a reader gets it
+						for watch in self._watches:
+							try:
+								if watch.update(frame) is True:
+									self._watchEvals += 1
+								else:
+									self._watchSkips += 1
+							except Exception as e:
+								log(logging.WARNING, f"removing watch that failed to evaluate: {e}")
+								failed.append(watch)
+
+						with self._frameCond:
+							self._ringIdx = idx
+							self._frame = frame
+							self._frameCond.notify_all()
+					self._clock.notify()
+
+					for watch in failed:
+						self.unwatch(watch)
+
+					if (recorder := self._recorder) is not None:
+						recorder.push(self._ring[idx])
+				elif self._source.exhausted is True:
+					log(logging.DEBUG, "frame source is exhausted")
+					break
+				else:
+					self._readFailures += 1
+					log(logging.WARNING, "Failed to read from VideoCapture")
 		except Exception as e:
 			log(logging.ERROR, f"{_THREAD_VIDCAP} has crashed: {e}")
 		finally:
 			log(logging.DEBUG, f"{_THREAD_VIDCAP} is stopping")
 
+	def _decode(self, idx: int) -> bool:
+		slot = self._ring[idx]
+		ok, frame = self._source.read(slot)
+		if ok is True and frame is not slot:
+			# resolution differs from the requested one, adopt the buffer OpenCV allocated
+			self._ring[idx] = frame
+		return ok
+
+	def _publish(self, idx: int) -> Frame:
+		self._frameId += 1
+
+		timestamp = self._clock.now()
+		if self._clock is SYSTEM_CLOCK and (captured := self._source.timestamp) is not None:
+			# e.g. published by a broker, the frame has aged on the way here already
+			timestamp = min(timestamp, captured)
+		self._timestamps.append(timestamp)
+
+		view = self._ring[idx].view()
+		view.flags.writeable = False
+		return Frame(view, self._frameId, timestamp)
+
 	@property
 	def width(self) -> int:
 		return self._width
@@ -93,49 +186,159 @@ class Capture:
 	def fps(self) -> int:
 		return self._fps
 
+	@property
+	def clock(self) -> Clock:
+		return self._clock
+
+	@property
+	def source(self) -> FrameSource:
+		return self._source
+
 	@property
 	def isCapturing(self) -> bool:
-		return self._isCapturing
+		return self._recorder is not None
+
+	@property
+	def recorder(self) -> Optional[Recorder]:
+		return self._recorder
+
+	@property
+	def frameId(self) -> int:
+		return self._frame.id
+
+	def _consume(self, frame: Frame) -> Frame:
+		if frame.id == self._lastReadId:
+			self._duplicateReads += 1
+		self._lastReadId = frame.id
+
+		age = self._clock.now() - frame.timestamp
+		self._nReads += 1
+		self._ageSum += age
+		self._ageMax = max(self._ageMax, age)
 
-	def _read(self) -> numpy.ndarray:
-		with self._frameLock:
-			frame = self._frame.copy()
 		return frame
 
+	@property
+	def effectiveFps(self) -> float:
+		"""fps actually delivered by the source over the last few frames"""
+		if len(timestamps := tuple(self._timestamps)) < 2:
+			return 0.0
+		return (len(timestamps) - 1) * 1e9 / ((timestamps[-1] - timestamps[0]) or 1)
+
+	def stats(self) -> tuple[tuple[str, Any], ...]:
+		ageAvg = self._ageSum / (self._nReads or 1) / 1e6
+		ageMax = self._ageMax / 1e6
+
+		stats: list[tuple[str, Any]] = [
+			("Capture fps", f"{self.effectiveFps:.1f}/{self._source.fps:g}"),
+			("Frames (failed reads)", f"{self._frameId} ({self._readFailures})"),
+			("Duplicate reads", f"{self._duplicateReads}/{self._nReads}"),
+			("Frame age (avg/max)", f"{ageAvg:.1f}ms | {ageMax:.1f}ms"),
+			("Unchanged frames", f"{self._unchangedFrames}/{self._frameId}"),
+			("Skipped watch checks", f"{self._watchSkips}/{self._watchSkips + self._watchEvals}"),
+		]
+
+		stats.extend(self._source.stats())
+
+		if (recorder := self._recorder) is not None:
+			stats.append(("Recorder (written/dropped)", f"{recorder.written}/{recorder.dropped}"))
+
+		if (preview := self._preview) is not None:
+			stats.append(("Preview frames", preview.rendered))
+
+		return tuple(stats)
+
+	def _read(self) -> numpy.ndarray:
+		return self.read().ndarray
+
 	def read(self) -> Frame:
-		return Frame(self._read())
+		"""
+		@return latest frame as a read-only view into the ring (no copy is made)
+		"""
+		with self._frameCond:
+			return self._consume(self._frame)
+
+	def readNext(self, lastId: int, timeout: float = 1.0) -> Frame:
+		"""
+		block until a frame newer than `lastId` was captured
+
+		@param lastId id of the last frame the caller has seen
+		@param timeout max time to wait (in seconds)
+		@return the newer frame, or the latest one if none arrived within `timeout`
+		"""
+		return self._consume(self._waitNext(lastId, timeout))
+
+	def _waitNext(self, lastId: int, timeout: float) -> Frame:
+		# like `readNext`, for internal consumers that must not show up in the read stats
+		with self._frameCond:
+			self._clock.waitFor(self._frameCond, lambda: self._frame.id > lastId, timeout)
+			return self._frame
+
+	def watch(self, predicate: Callable[[Frame], bool]) -> Watch:
+		"""
+		evaluate `predicate` on the latest frame (on the calling thread), then on every captured frame
+		(on the capture thread) until `unwatch` is called; a source that stalled or ran out still gets its last frame checked
 
-	def startCapture(self, path: str) -> None:
-		# FIXME
-		return
-		if self._isCapturing:
+		@return the watch collecting the edges of `predicate`
+		"""
+		watch = Watch(predicate)
+		with self._watchLock:
+			watch.update(self._frame)
+			self._watches = self._watches + (watch,)
+		return watch
+
+	def unwatch(self, watch: Watch) -> None:
+		with self._watchLock:
+			self._watches = tuple(w for w in self._watches if w is not watch)
+
+	def startCapture(self, path: str, *, queueSize: int = 30, dropPolicy: DropPolicy = DropPolicy.DropOldest) -> None:
+		"""
+		record every captured frame to `{path}.avi` in the background
+
+		@param path file to record to (without extension); missing directories are created
+		@param queueSize max amount of frames waiting to be encoded
+		@param dropPolicy what to do with frames when the encoder can't keep up
+		"""
+		if self._recorder is not None:
 			log(logging.WARNING, "A capture is already running")
 			return
 
-		def _runCap() -> None:
-			nonlocal self
-			log(logging.DEBUG, f"{_THREAD_VIDWRITE} is running")
-			height = int(self.vid.get(cv2.CAP_PROP_FRAME_HEIGHT))
-			width = int(self.vid.get(cv2.CAP_PROP_FRAME_WIDTH))
+		pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+		self._recorder = Recorder(f"{path}.avi", self._source.fps, self._frame.ndarray.shape, queueSize=queueSize, dropPolicy=dropPolicy)
 
-			writer = cv2.VideoWriter(f"{path}.avi", cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (width, height), True)
+	def stopCapture(self) -> None:
+		if (recorder := self._recorder) is not None:
+			self._recorder = None
+			recorder.stop()
+			log(logging.DEBUG, f"capture stopped: {recorder.written} frames written, {recorder.dropped} dropped")
 
-			assert writer.isOpened()
+	def startPreview(self, windowName: str, *, fps: float = 15, scale: float = 1.0) -> Preview:
+		"""
+		show the captured frames in a window, rendered by its own thread where the platform allows it (see `Preview`)
 
-			try:
-				while self._isCapturing is True:
-					writer.write(self._read())
-			finally:
-				log(logging.DEBUG, f"{_THREAD_VIDWRITE} is stopping")
-				writer.release()
+		@param windowName title of the window
+		@param fps max refresh rate of the window
+		@param scale factor frames are resized by before they are shown
+		"""
+		if self._preview is None:
+			self._preview = Preview(self._waitNext, windowName, fps=fps, scale=scale)
+		return self._preview
 
-		self._isCapturing = True
-		self._writeThread = Thread(target=_runCap, name=_THREAD_VIDWRITE)
-		self._writeThread.start()
+	def stopPreview(self) -> None:
+		if (preview := self._preview) is not None:
+			self._preview = None
+			preview.stop()
 
-	def stopCapture(self) -> None:
-		# FIXME
-		return
-		if self._isCapturing is True:
-			self._isCapturing = False
-			self._writeThread.join()
+	@property
+	def preview(self) -> Optional[Preview]:
+		return self._preview
+
+	def dumpClip(self, path: str) -> Optional[Thread]:
+		"""
+		write the buffered pre-trigger clip to the directory `path` in the background
+
+		@return the thread writing the clip, or None if no clip is buffered
+		"""
+		if self._clip is None:
+			return None
+		return self._clip.dump(path)
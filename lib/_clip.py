@@ -0,0 +1,102 @@
+import collections
+import logging
+import pathlib
+import threading
+from threading import Thread
+from typing import Callable
+from typing import final
+
+import cv2
+
+from ._frame import Frame
+from ._logging import log
+
+
+_THREAD_CLIPENCODE = "Thread-ClipBuffer_encode"
+_THREAD_CLIPDUMP = "Thread-ClipBuffer_dump"
+
+
+@final
+class ClipBuffer:
+	def __init__(self, readNext: Callable[[int, float], Frame], seconds: float, fps: float, *, quality: int = 80, maxBytes: int = 100_000_000) -> None:
+		"""
+		keeps the last `seconds` of captured frames as JPEG bytes
+
+		@param readNext blocking read of the next frame (`Capture.readNext`)
+		@param seconds length of the clip
+		@param fps fps of the capture
+		@param quality JPEG quality (0-100)
+		@param maxBytes upper bound for the encoded frames; the oldest frames are dropped beyond that
+		"""
+
+		self._readNext = readNext
+		self._params = (cv2.IMWRITE_JPEG_QUALITY, quality)
+		self._maxBytes = maxBytes
+
+		self._ring: collections.deque[bytes] = collections.deque(maxlen=max(1, round(seconds * fps)))
+		self._nBytes = 0
+		self._lock = threading.Lock()
+
+		self._doEncode = True
+		self._thread = Thread(target=self._encode, name=_THREAD_CLIPENCODE, daemon=True)
+		self._thread.start()
+
+	def _encode(self) -> None:
+		log(logging.DEBUG, f"{_THREAD_CLIPENCODE} is running")
+
+		frameId = 0
+		try:
+			while self._doEncode is True:
+				frame = self._readNext(frameId, 1.0)
+				if frame.id == frameId:
+					continue
+				frameId = frame.id
+
+				ok, buf = cv2.imencode(".jpg", frame.ndarray, self._params)
+				if ok is False:
+					continue
+				data = buf.tobytes()
+
+				with self._lock:
+					if len(self._ring) == self._ring.maxlen:
+						self._nBytes -= len(self._ring[0])
+					self._ring.append(data)
+					self._nBytes += len(data)
+
+					while self._nBytes > self._maxBytes:
+						self._nBytes -= len(self._ring.popleft())
+		except Exception as e:
+			log(logging.ERROR, f"{_THREAD_CLIPENCODE} has crashed: {e}")
+		finally:
+			log(logging.DEBUG, f"{_THREAD_CLIPENCODE} is stopping")
+
+	def stop(self) -> None:
+		self._doEncode = False
+		self._thread.join()
+
+	@property
+	def nBytes(self) -> int:
+		return self._nBytes
+
+	def __len__(self) -> int:
+		return len(self._ring)
+
+	def dump(self, path: str) -> Thread:
+		"""
+		write the buffered frames as numbered JPEGs into the directory `path` in the background
+
+		@return the thread writing the files
+		"""
+		with self._lock:
+			frames = tuple(self._ring)
+
+		def _dump() -> None:
+			outDir = pathlib.Path(path)
+			outDir.mkdir(parents=True, exist_ok=True)
+			for i, data in enumerate(frames):
+				(outDir / f"{i:05}.jpg").write_bytes(data)
+			log(logging.DEBUG, f"dumped {len(frames)} frames to {outDir}")
+
+		thread = Thread(target=_dump, name=_THREAD_CLIPDUMP)
+		thread.start()
+		return thread
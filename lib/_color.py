@@ -1,8 +1,59 @@
 from __future__ import annotations
 
+from enum import IntEnum
 from typing import final
 from typing import NamedTuple
 
+import cv2
+import numpy
+
+
+@final
+class Metric(IntEnum):
+	"""color space `Color.distance` (and signatures) measure in; every metric is a squared euclidean distance"""
+
+	RGB = 0
+	# CIE L*a*b* (squared ΔE 1976), roughly uniform in perceived difference
+	LAB = 1
+	# HSV cone scaled to 0 - 255, hue differences weigh less for dark and unsaturated colors
+	HSV = 2
+
+
+# channels are reduced to this many bits for the lookup tables (64³ entries)
+_LUT_BITS = 6
+_LUT_SHIFT = 8 - _LUT_BITS
+_LUTS: dict[Metric, numpy.ndarray] = {}
+# index of a reduced BGR pixel is a dot product with these
+_BGR_WEIGHTS = numpy.array((1, 1 << _LUT_BITS, 1 << (2 * _LUT_BITS)), dtype=numpy.int32)
+
+
+def _buildLut(metric: Metric) -> numpy.ndarray:
+	# center of each reduced bucket
+	levels = (numpy.arange(1 << _LUT_BITS, dtype=numpy.float32) + 0.5) * (1 << _LUT_SHIFT) / 255
+	r, g, b = numpy.meshgrid(levels, levels, levels, indexing="ij")
+	rgb = numpy.stack((r, g, b), axis=-1).reshape(1, -1, 3)
+
+	if metric is Metric.LAB:
+		converted = cv2.cvtColor(rgb, cv2.COLOR_RGB2Lab)
+	else:
+		h, s, v = cv2.split(cv2.cvtColor(rgb, cv2.COLOR_RGB2HSV))
+		h = numpy.deg2rad(h)
+		converted = numpy.dstack((s * v * numpy.cos(h) * 127.5, s * v * numpy.sin(h) * 127.5, v * 255))
+
+	return numpy.rint(converted).astype(numpy.int32).reshape(-1, 3)
+
+
+def metricLut(metric: Metric) -> numpy.ndarray:
+	"""@return (64³, 3) table of the coordinates of every reduced RGB color in `metric`, built on first use"""
+	if (lut := _LUTS.get(metric)) is None:
+		lut = _LUTS[metric] = _buildLut(metric)
+	return lut
+
+
+def lutIndex(bgr: numpy.ndarray) -> numpy.ndarray:
+	"""@return indices into `metricLut` of the (N, 3) integer BGR colors"""
+	return (bgr >> _LUT_SHIFT) @ _BGR_WEIGHTS
+
 
 @final
 class Color(NamedTuple):
@@ -25,5 +76,13 @@ class Color(NamedTuple):
 	def __str__(self) -> str:
 		return f"({self.r}, {self.g}, {self.b})"
 
-	def distance(self, other: Color) -> int:
-		return sum((c2 - c1) ** 2 for c1, c2 in zip(other.tpl, self.tpl))
+	def distance(self, other: Color, metric: Metric = Metric.RGB) -> int:
+		if metric is Metric.RGB:
+			c1, c2 = self, other
+		else:
+			lut = metricLut(metric)
+			c1 = lut[(self.r >> _LUT_SHIFT) << (2 * _LUT_BITS) | (self.g >> _LUT_SHIFT) << _LUT_BITS | self.b >> _LUT_SHIFT].tolist()
+			c2 = lut[(other.r >> _LUT_SHIFT) << (2 * _LUT_BITS) | (other.g >> _LUT_SHIFT) << _LUT_BITS | other.b >> _LUT_SHIFT].tolist()
+
+		d0, d1, d2 = c1[0] - c2[0], c1[1] - c2[1], c1[2] - c2[2]
+		return d0 * d0 + d1 * d1 + d2 * d2
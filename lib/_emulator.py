@@ -0,0 +1,146 @@
+import collections
+import itertools
+import logging
+import os
+import select
+import threading
+from threading import Thread
+from typing import Any
+from typing import final
+from typing import NamedTuple
+
+from ._button import Button
+from ._logging import log
+from ._timing import Clock
+from ._timing import SYSTEM_CLOCK
+
+
+_THREAD_EMULATOR = "Thread-Emulator"
+
+_BUTTONS: dict[int, Button] = {ord(b.value): b for b in Button}
+_BUZZER_ON = ord("!")
+_BUZZER_OFF = ord(".")
+
+
+@final
+class EmulatorEvent(NamedTuple):
+	# `Clock.now` when the byte was read
+	timestamp: int
+	data: int
+	# state after the byte
+	held: Button
+	buzzer: bool
+
+
+@final
+class Emulator:
+	def __init__(self, *, history: int = 100_000, clock: Clock = SYSTEM_CLOCK) -> None:
+		"""
+		pretends to be the microcontroller on a pseudo terminal (posix only);
+		use `port` as the `serialPort`
+
+		speaks the same protocol: every byte is a `Button` to hold (`Button.EMPTY` releases),
+		'!' and '.' turn the buzzer on and off
+
+		@param history amount of received bytes kept (oldest are dropped)
+		@param clock received bytes are timestamped with
+		"""
+
+		if os.name != "posix":
+			raise OSError("the emulator needs a pseudo terminal, which is only available on posix systems")
+		# needs termios, which doesn't exist on windows
+		import tty
+
+		self._clock = clock
+
+		self._master, self._slave = os.openpty()
+		# no echo, no line buffering, no translation of the bytes
+		tty.setraw(self._slave)
+		self.port: str = os.ttyname(self._slave)
+
+		self._held = Button.EMPTY
+		self._buzzer = False
+
+		self._events: collections.deque[EmulatorEvent] = collections.deque(maxlen=history)
+		self._lock = threading.Lock()
+		self._received = 0
+		self._changes = 0
+		self._unknown = 0
+
+		self._doRead = True
+		self._thread = Thread(target=self._read, name=_THREAD_EMULATOR, daemon=True)
+		self._thread.start()
+
+	def _read(self) -> None:
+		log(logging.DEBUG, f"{_THREAD_EMULATOR} is running on {self.port}")
+
+		try:
+			while self._doRead is True:
+				if not select.select((self._master,), (), (), 0.1)[0]:
+					continue
+				t = self._clock.now()
+				for byte in os.read(self._master, 256):
+					self._handle(t, byte)
+				self._clock.notify()
+		except OSError as e:
+			# the port was closed
+			log(logging.DEBUG, f"{_THREAD_EMULATOR}: {e}")
+		except Exception as e:
+			log(logging.ERROR, f"{_THREAD_EMULATOR} has crashed: {e}")
+		finally:
+			log(logging.DEBUG, f"{_THREAD_EMULATOR} is stopping")
+
+	def _handle(self, t: int, byte: int) -> None:
+		held, buzzer = self._held, self._buzzer
+		if (button := _BUTTONS.get(byte)) is not None:
+			held = button
+		elif byte == _BUZZER_ON:
+			buzzer = True
+		elif byte == _BUZZER_OFF:
+			buzzer = False
+		else:
+			self._unknown += 1
+			log(logging.WARNING, f"emulator: unknown command {bytes((byte,))!r}")
+
+		if (held, buzzer) != (self._held, self._buzzer):
+			self._changes += 1
+			log(logging.DEBUG, f"emulator: {t} {held.name}{' (buzzer)' if buzzer else ''}")
+
+		with self._lock:
+			self._held, self._buzzer = held, buzzer
+			self._received += 1
+			self._events.append(EmulatorEvent(t, byte, held, buzzer))
+
+	def close(self) -> None:
+		self._doRead = False
+		self._thread.join()
+		os.close(self._slave)
+		os.close(self._master)
+
+	@property
+	def held(self) -> Button:
+		return self._held
+
+	@property
+	def buzzer(self) -> bool:
+		return self._buzzer
+
+	@property
+	def received(self) -> int:
+		return self._received
+
+	def events(self, since: int = 0) -> tuple[EmulatorEvent, ...]:
+		"""@return the bytes received at or after `since` (see `Clock.now`)"""
+		# from the newest, so polling for recent ones stays cheap with a long history
+		with self._lock:
+			recent = tuple(itertools.takewhile(lambda e: e.timestamp >= since, reversed(self._events)))
+		return recent[::-1]
+
+	def stats(self) -> tuple[tuple[str, Any], ...]:
+		return (
+			("Emulator bytes (unknown)", f"{self._received} ({self._unknown})"),
+			("Emulator state changes", self._changes),
+		)
+
+	def __str__(self) -> str:
+		return f"emulator on {self.port}"
@@ -1,20 +1,136 @@
+from __future__ import annotations
+
+import threading
+import zlib
+from collections.abc import Sequence
 from typing import final
+from typing import Optional
+from typing import Union
 
+import cv2
 import numpy
 
 from ._color import Color
+from ._color import lutIndex
+from ._color import Metric
+from ._color import metricLut
 from ._pos import Pos
+from ._pos import Rect
+from ._probe import ProbeSet
+from ._template import Match
+from ._template import Template
+
+
+# probe sets with fewer patches sum them directly, unless the frame's integral was computed already (it takes about as long as 80 patches)
+_INTEGRAL_MIN_PROBES = 32
 
 
 @final
 class Frame:
-	def __init__(self, frame: numpy.ndarray) -> None:
+	def __init__(self, frame: numpy.ndarray, frameId: int = 0, timestamp: int = 0) -> None:
+		"""
+		@param frame image data (BGR)
+		@param frameId sequence number of the frame in its capture
+		@param timestamp time the frame was captured at (see `Clock.now`)
+		"""
+
 		self._frame = frame
+		self._id = frameId
+		self._timestamp = timestamp
+
+		self._integral: Optional[numpy.ndarray] = None
+		# the capture thread (watches) and the script may both want it first
+		self._integralLock = threading.Lock()
+		self._fingerprint: Optional[int] = None
 
 	@property
 	def ndarray(self) -> numpy.ndarray:
 		return self._frame
 
+	@property
+	def id(self) -> int:
+		return self._id
+
+	@property
+	def timestamp(self) -> int:
+		return self._timestamp
+
+	@property
+	def fingerprint(self) -> int:
+		"""
+		crc of the pixel data, computed on first use; equal fingerprints mean equal content (but for crc collisions)
+
+		covers every pixel and depends on where each one is, so content moving over a flat background changes it too
+		"""
+		if self._fingerprint is None:
+			self._fingerprint = zlib.crc32(numpy.ascontiguousarray(self._frame))
+		return self._fingerprint
+
+	@property
+	def integral(self) -> numpy.ndarray:
+		"""
+		summed-area table ((height + 1, width + 1, 3), BGR) of the frame;
+		computed once on first use and shared by every patch probe evaluated on this frame after that
+		"""
+		if self._integral is None:
+			with self._integralLock:
+				if self._integral is None:
+					self._integral = cv2.integral(self._frame, sdepth=cv2.CV_32S)
+		return self._integral
+
+	def copy(self) -> Frame:
+		"""
+		frames handed out by a capture are read-only views into its ring buffer,
+		so keep a copy of any frame that has to outlive a few captured frames
+		"""
+		frame = Frame(self._frame.copy(), self._id, self._timestamp)
+		frame._fingerprint = self._fingerprint
+		return frame
+
 	def colorAt(self, pos: Pos) -> Color:
-		b, g, r = self._frame[pos.y][pos.x]
+		b, g, r = self._frame[pos.y, pos.x].tolist()
 		return Color(r, g, b)
+
+	def _bgrAt(self, probeSet: ProbeSet) -> numpy.ndarray:
+		if probeSet.radius > 0:
+			y1, y2, x1, x2, area = probeSet.patchCorners(*self._frame.shape[:2])
+			if self._integral is None and len(probeSet) < _INTEGRAL_MIN_PROBES:
+				sums = numpy.array([self._frame[a:b, c:d].sum(axis=(0, 1)) for a, b, c, d in zip(y1, y2, x1, x2)], dtype=numpy.int32).reshape(-1, 3)
+			else:
+				integral = self.integral
+				sums = integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+			# rounded mean
+			return (sums + area // 2) // area
+		elif self._frame.flags.c_contiguous:
+			# `take` on the flattened frame is about twice as fast as fancy indexing
+			pixels = self._frame.reshape(-1, 3).take(probeSet.flatIndex(self._frame.shape[1]), axis=0)
+		else:
+			pixels = self._frame[probeSet.ys, probeSet.xs]
+		return pixels.astype(numpy.int32)
+
+	def find(self, template: Template, roi: Optional[Rect] = None) -> Optional[Match]:
+		"""
+		@param roi region to search (default: the template's)
+		@return position of `template` in the frame, if found
+		"""
+		return template.find(self._frame, roi)
+
+	def colorsAt(self, positions: Union[ProbeSet, Sequence[Pos]]) -> numpy.ndarray:
+		"""
+		@return (N, 3) array of the RGB colors at `positions`
+		"""
+		if not isinstance(positions, ProbeSet):
+			positions = ProbeSet(tuple((pos, Color.Black()) for pos in positions))
+
+		return self._bgrAt(positions)[:, ::-1]
+
+	def distancesTo(self, probeSet: ProbeSet, metric: Metric = Metric.RGB) -> numpy.ndarray:
+		"""
+		@return (N,) array of the distances (see `Color.distance`) between each probe and the frame
+		"""
+		bgr = self._bgrAt(probeSet)
+		if metric is Metric.RGB:
+			diff = bgr - probeSet.bgr
+		else:
+			diff = metricLut(metric).take(lutIndex(bgr), axis=0) - probeSet.converted(metric)
+		return (diff * diff).sum(axis=1)
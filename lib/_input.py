@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Iterable
+from typing import final
+from typing import NamedTuple
+from typing import Optional
+
+from ._button import Button
+from ._capture import Capture
+from ._logging import log
+from ._macro import Macro
+from ._macro import Step
+from ._serial import SerialWriter
+
+
+_BUTTONS: dict[bytes, Button] = {b.encode(): b for b in Button}
+
+
+@final
+class RecordedInput(NamedTuple):
+	# ns since the first input
+	offset: int
+	data: bytes
+	# frames captured since the first input, when it was written
+	frame: int
+
+
+@final
+class InputRecording:
+	def __init__(self, inputs: Iterable[RecordedInput], duration: int) -> None:
+		"""
+		@param duration ns from the first input until the recording was stopped
+		"""
+
+		self.inputs: tuple[RecordedInput, ...] = tuple(inputs)
+		self._duration = duration
+
+	@property
+	def duration(self) -> float:
+		return self._duration / 1e9
+
+	def macro(self, name: Optional[str] = None) -> Macro:
+		"""
+		compile the recorded presses into a macro with the same timing (to the ns), from the first input until the recording was stopped
+
+		a button pressed while another one is held releases that one first (as the controller does);
+		writes that aren't buttons (e.g. the buzzer) can't be replayed and are left out
+		"""
+		steps: list[Step] = []
+		# button held, when it was pressed and when it was released
+		held: Optional[tuple[Button, int, Optional[int]]] = None
+		skipped = 0
+
+		for offset, data, _ in self.inputs:
+			if (button := _BUTTONS.get(data)) is None:
+				skipped += 1
+			elif button is Button.EMPTY:
+				if held is not None and held[2] is None:
+					held = (held[0], held[1], offset)
+			elif held is None or held[0] is not button or held[2] is not None:
+				if held is not None:
+					pressed, released = held[1], offset if held[2] is None else held[2]
+					steps.append(Step(held[0], (released - pressed) / 1e9, (offset - released) / 1e9))
+				elif offset > 0:
+					# writes before the first press (e.g. releases)
+					steps.append(Step.wait(offset / 1e9))
+				held = (button, offset, None)
+
+		if held is not None:
+			pressed, released = held[1], self._duration if held[2] is None else held[2]
+			steps.append(Step(held[0], (released - pressed) / 1e9, (self._duration - released) / 1e9))
+		elif self._duration > 0:
+			steps.append(Step.wait(self._duration / 1e9))
+
+		if skipped > 0:
+			log(logging.WARNING, f"{skipped} recorded writes aren't buttons and can't be replayed")
+
+		return Macro(steps, name=name or f"recording of {self.duration:.1f}s")
+
+	def save(self, path: str) -> None:
+		raw = {
+			"duration": self._duration,
+			"inputs": [(offset, data.decode(), frame) for offset, data, frame in self.inputs],
+		}
+		with open(path, "w") as f:
+			json.dump(raw, f, indent="\t")
+
+	@staticmethod
+	def load(path: str) -> InputRecording:
+		with open(path, "r") as f:
+			raw = json.load(f)
+		return InputRecording((RecordedInput(offset, data.encode(), frame) for offset, data, frame in raw["inputs"]), raw["duration"])
+
+	def __len__(self) -> int:
+		return len(self.inputs)
+
+
+@final
+class InputRecorder:
+	def __init__(self, ser: SerialWriter, cap: Capture) -> None:
+		"""
+		records everything written to `ser` (e.g. by a human pressing buttons through a `Script`),
+		timestamped on the clock of `cap` along with the id of the latest frame `cap` captured
+
+		stops with `stop`
+		"""
+
+		self._ser = ser
+		self._cap = cap
+		self._clock = cap.clock
+
+		# (`Clock.now`, data, frame id); appended by whichever thread writes
+		self._inputs: list[tuple[int, bytes, int]] = []
+		self._recording = True
+
+		ser.listen(self._record)
+
+	def _record(self, data: bytes) -> None:
+		self._inputs.append((self._clock.now(), data, self._cap.frameId))
+
+	@property
+	def isRecording(self) -> bool:
+		return self._recording
+
+	def __len__(self) -> int:
+		return len(self._inputs)
+
+	def stop(self) -> InputRecording:
+		"""@return what was recorded, relative to the first input"""
+		tEnd = self._clock.now()
+		if self._recording is True:
+			self._recording = False
+			self._ser.unlisten(self._record)
+
+		if len(self._inputs) == 0:
+			return InputRecording((), 0)
+
+		tFirst, _, frameFirst = self._inputs[0]
+		return InputRecording((RecordedInput(t - tFirst, data, frame - frameFirst) for t, data, frame in self._inputs), tEnd - tFirst)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Iterable
+from threading import Thread
+from typing import Any
+from typing import Callable
+from typing import final
+from typing import NamedTuple
+from typing import Optional
+
+from ._button import Button
+from ._logging import log
+from ._timing import Clock
+from ._timing import JitterStats
+from ._timing import SYSTEM_CLOCK
+
+
+_THREAD_MACRO = "Thread-Macro"
+
+# waits longer than this are interruptible by `MacroHandle.cancel`, the rest is slept precisely
+_CANCEL_MARGIN_NS = 3_000_000
+
+
+@final
+class Step(NamedTuple):
+	button: Button
+	# seconds the button is held
+	hold: float = 0.05
+	# seconds until the next step starts, after releasing the button
+	gap: float = 0.075
+
+	@staticmethod
+	def wait(seconds: float) -> Step:
+		return Step(Button.EMPTY, 0, seconds)
+
+
+@final
+class Macro:
+	def __init__(self, steps: Iterable[Step], *, name: Optional[str] = None) -> None:
+		"""
+		button steps compiled into a timeline of serial writes (offsets from the start of the macro)
+
+		@param name used in logs
+		"""
+
+		self.steps: tuple[Step, ...] = tuple(steps)
+		self.name = name or f"{len(self.steps)} steps"
+
+		events: list[tuple[int, bytes]] = []
+		t = 0
+		for step in self.steps:
+			if step.button is not Button.EMPTY:
+				events.append((t, step.button.encode()))
+				events.append((t + round(step.hold * 1e9), Button.EMPTY.encode()))
+			t += round((step.hold + step.gap) * 1e9)
+
+		self.events: tuple[tuple[int, bytes], ...] = tuple(events)
+		self._duration = t
+
+	@property
+	def duration(self) -> float:
+		return self._duration / 1e9
+
+	def __add__(self, other: Macro) -> Macro:
+		return Macro(self.steps + other.steps, name=f"{self.name} + {other.name}")
+
+	def __mul__(self, n: int) -> Macro:
+		return Macro(self.steps * n, name=f"{n}x {self.name}")
+
+	def __len__(self) -> int:
+		return len(self.steps)
+
+	def __str__(self) -> str:
+		return self.name
+
+
+@final
+class MacroHandle:
+	def __init__(self, macro: Macro, write: Callable[[bytes], Any], start: int, jitter: Optional[JitterStats] = None, *, clock: Clock = SYSTEM_CLOCK) -> None:
+		"""
+		plays `macro` on its own thread, independent of whatever the caller's thread does meanwhile
+
+		@param write sends bytes to the controller
+		@param start time the macro starts at (see `Clock.now`)
+		@param jitter records the lateness of every write
+		@param clock to play on
+		"""
+
+		self.macro = macro
+
+		self._write = write
+		self._start = start
+		self._jitter = jitter
+		self._clock = clock
+
+		self._cancelled = threading.Event()
+		self._done = threading.Event()
+
+		self._thread = Thread(target=self._play, name=_THREAD_MACRO, daemon=True)
+		clock.attach(self._thread)
+		self._thread.start()
+
+	def _play(self) -> None:
+		log(logging.DEBUG, f"{_THREAD_MACRO} is playing {self.macro}")
+
+		held = False
+		try:
+			for offset, data in self.macro.events:
+				deadline = self._start + offset
+				if (left := deadline - self._clock.now()) > _CANCEL_MARGIN_NS and self._clock.waitEvent(self._cancelled, (left - _CANCEL_MARGIN_NS) / 1e9):
+					break
+				elif self._cancelled.is_set():
+					break
+
+				lateness = self._clock.sleepUntil(deadline)
+				self._write(data)
+				held = data != Button.EMPTY.encode()
+
+				if self._jitter is not None:
+					self._jitter.record(lateness)
+			else:
+				# the gap of the last step
+				if (left := self.end - self._clock.now()) > 0:
+					self._clock.waitEvent(self._cancelled, left / 1e9)
+		except Exception as e:
+			log(logging.ERROR, f"{_THREAD_MACRO} has crashed: {e}")
+		finally:
+			if held is True:
+				self._write(Button.EMPTY.encode())
+			self._done.set()
+			self._clock.notify()
+			log(logging.DEBUG, f"{_THREAD_MACRO} is stopping{' (cancelled)' if self._cancelled.is_set() else ''}")
+
+	@property
+	def end(self) -> int:
+		"""time the macro ends at (see `Clock.now`)"""
+		return self._start + self.macro._duration
+
+	@property
+	def done(self) -> bool:
+		return self._done.is_set()
+
+	def wait(self, timeout: Optional[float] = None) -> bool:
+		"""@return whether the macro is done"""
+		return self._clock.waitEvent(self._done, timeout)
+
+	def cancel(self) -> None:
+		"""stop playing (releasing any held button) and wait for it"""
+		self._cancelled.set()
+		# on the clock, the macro may still have to wait for it to release the button
+		self._clock.waitEvent(self._done, None)
+		self._thread.join()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import collections
+from typing import final
+from typing import NamedTuple
+from typing import Optional
+from typing import TYPE_CHECKING
+
+import cv2
+import numpy
+
+from ._pos import Rect
+
+if TYPE_CHECKING:
+	from ._frame import Frame
+
+
+@final
+class MotionSample(NamedTuple):
+	frameId: int
+	timestamp: int
+	energy: float
+
+
+@final
+class MotionDetector:
+	def __init__(
+		self,
+		roi: Optional[Rect] = None,
+		*,
+		scale: int = 4,
+		noise: int = 12,
+		threshold: float = 0.5,
+		maxSamples: int = 1800,
+	) -> None:
+		"""
+		measures how much a region changes between consecutive frames
+
+		meant to be passed to `Capture.watch`, which evaluates it on every captured frame
+		whose content changed (unchanged frames have no energy and are not sampled)
+
+		@param roi region to watch (default: whole frame)
+		@param scale factor the region is downscaled by before diffing (also averages out capture noise)
+		@param noise per pixel differences (grayscale, 0 - 255) up to this are ignored
+		@param threshold energy above which a frame counts as moving (the watch's state)
+		@param maxSamples amount of samples kept (oldest are dropped)
+		"""
+
+		if scale < 1:
+			raise ValueError(f"scale must be at least 1 (got {scale})")
+
+		self.roi = roi
+		self.threshold = threshold
+
+		self._scale = scale
+		self._noise = noise
+		self._samples: collections.deque[MotionSample] = collections.deque(maxlen=maxSamples)
+
+		# reused between frames: grayscale region, previous and current downscaled region, their difference
+		self._gray: Optional[numpy.ndarray] = None
+		self._small: list[numpy.ndarray] = []
+		self._diff: Optional[numpy.ndarray] = None
+		self._hasPrevious = False
+
+	def reset(self) -> None:
+		"""drop the samples and the previous frame, e.g. at the start of an encounter"""
+		self._samples.clear()
+		self._hasPrevious = False
+
+	def _region(self, frame: numpy.ndarray) -> numpy.ndarray:
+		if (roi := self.roi) is None:
+			return frame
+		return frame[max(roi.y, 0):roi.y + roi.height, max(roi.x, 0):roi.x + roi.width]
+
+	def update(self, frame: Frame) -> float:
+		"""
+		@return energy of the change since the previous frame: mean difference above the noise floor (0 - 255)
+		"""
+		region = self._region(frame.ndarray)
+		height, width = region.shape[:2]
+
+		if self._gray is None or self._gray.shape != (height, width):
+			self._gray = numpy.empty((height, width), dtype=numpy.uint8)
+			size = (max(height // self._scale, 1), max(width // self._scale, 1))
+			self._small = [numpy.empty(size, dtype=numpy.uint8) for _ in range(2)]
+			self._diff = numpy.empty(size, dtype=numpy.uint8)
+			self._hasPrevious = False
+
+		previous, current = self._small
+		cv2.cvtColor(region, cv2.COLOR_BGR2GRAY, dst=self._gray)
+		cv2.resize(self._gray, current.shape[::-1], dst=current, interpolation=cv2.INTER_AREA)
+		self._small.reverse()
+
+		if self._hasPrevious is False:
+			self._hasPrevious = True
+			return 0.0
+
+		cv2.absdiff(current, previous, dst=self._diff)
+		cv2.threshold(self._diff, self._noise, 0, cv2.THRESH_TOZERO, dst=self._diff)
+		energy = cv2.mean(self._diff)[0]
+
+		self._samples.append(MotionSample(frame.id, frame.timestamp, energy))
+		return energy
+
+	def __call__(self, frame: Frame) -> bool:
+		return self.update(frame) > self.threshold
+
+	@property
+	def samples(self) -> tuple[MotionSample, ...]:
+		return tuple(self._samples)
+
+	def series(self) -> numpy.ndarray:
+		"""@return energy of every sample"""
+		return numpy.fromiter((s.energy for s in tuple(self._samples)), dtype=numpy.float64)
+
+	@property
+	def peak(self) -> float:
+		return max((s.energy for s in tuple(self._samples)), default=0.0)
+
+	@property
+	def total(self) -> float:
+		"""sum of the energy of every sample"""
+		return sum(s.energy for s in tuple(self._samples))
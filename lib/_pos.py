@@ -12,4 +12,15 @@ class Pos(NamedTuple):
 		return f"({self.x}, {self.y})"
 
 
+@final
+class Rect(NamedTuple):
+	x: int
+	y: int
+	width: int
+	height: int
+
+	def __str__(self) -> str:
+		return f"({self.x}, {self.y}, {self.width}x{self.height})"
+
+
 LOADING_SCREEN_POS: Final[Pos] = Pos(705, 15)
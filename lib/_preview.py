@@ -0,0 +1,110 @@
+import logging
+import sys
+import threading
+import time
+from threading import Thread
+from typing import Callable
+from typing import final
+from typing import Optional
+
+import cv2
+
+from ._frame import Frame
+from ._logging import log
+
+
+_THREAD_PREVIEW = "Thread-Preview"
+
+# HighGUI only runs windows off the main thread on these (e.g. Cocoa on macOS requires the main thread)
+_THREADED_PLATFORMS = ("linux", "win32")
+
+
+@final
+class Preview:
+	def __init__(self, readNext: Callable[[int, float], Frame], windowName: str, *, fps: float = 15, scale: float = 1.0, threaded: Optional[bool] = None) -> None:
+		"""
+		shows the latest captured frame in a window, refreshed at most `fps` times per (real) second
+
+		@param readNext blocking read of the next frame (`Capture.readNext`)
+		@param windowName title of the window
+		@param fps max refresh rate of the window
+		@param scale factor frames are resized by before they are shown
+		@param threaded render on its own thread, so reading frames never waits for the GUI;
+			otherwise the thread that created the preview (the main one) must keep calling `poll`.
+			Defaults to threaded on the platforms whose GUI supports it (linux and windows)
+		"""
+
+		self._readNext = readNext
+		self._windowName = windowName
+		self._period = 1 / fps if fps > 0 else 0.0
+		self._scale = scale
+
+		self._stopRequested = threading.Event()
+		self._rendered = 0
+		self._frameId = 0
+		self._tNext = 0.0
+
+		self._doRender = True
+		self._thread: Optional[Thread] = None
+		if threaded is True or (threaded is None and sys.platform in _THREADED_PLATFORMS):
+			self._thread = Thread(target=self._render, name=_THREAD_PREVIEW, daemon=True)
+			self._thread.start()
+
+	def _show(self, timeout: float) -> None:
+		frame = self._readNext(self._frameId, timeout)
+		if frame.id != self._frameId:
+			self._frameId = frame.id
+			img = frame.ndarray
+			if self._scale != 1.0:
+				img = cv2.resize(img, None, fx=self._scale, fy=self._scale, interpolation=cv2.INTER_AREA)
+			cv2.imshow(self._windowName, img)
+			self._rendered += 1
+
+		# also pumps the window's events, so keep it going while no frames arrive
+		if cv2.waitKey(1) & 0xFF == ord("q"):
+			self._stopRequested.set()
+
+	def _render(self) -> None:
+		log(logging.DEBUG, f"{_THREAD_PREVIEW} is running")
+
+		try:
+			while self._doRender is True:
+				tNext = time.monotonic() + self._period
+				self._show(1.0)
+
+				if (tDelay := tNext - time.monotonic()) > 0:
+					time.sleep(tDelay)
+		except Exception as e:
+			log(logging.ERROR, f"{_THREAD_PREVIEW} has crashed: {e}")
+		finally:
+			if self._rendered > 0:
+				cv2.destroyWindow(self._windowName)
+			log(logging.DEBUG, f"{_THREAD_PREVIEW} is stopping")
+
+	def poll(self) -> None:
+		"""render the latest frame if the refresh is due (never waits); only needed if not `threaded`"""
+		if self._thread is not None or (t := time.monotonic()) < self._tNext:
+			return
+
+		self._tNext = t + self._period
+		self._show(0)
+
+	@property
+	def threaded(self) -> bool:
+		return self._thread is not None
+
+	def stop(self) -> None:
+		self._doRender = False
+		if self._thread is not None:
+			self._thread.join()
+		elif self._rendered > 0:
+			cv2.destroyWindow(self._windowName)
+
+	@property
+	def stopRequested(self) -> bool:
+		"""'q' was pressed in the window"""
+		return self._stopRequested.is_set()
+
+	@property
+	def rendered(self) -> int:
+		return self._rendered
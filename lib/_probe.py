@@ -0,0 +1,73 @@
+from collections.abc import Iterator
+from collections.abc import Sequence
+from typing import final
+
+import numpy
+
+from ._color import Color
+from ._color import lutIndex
+from ._color import Metric
+from ._color import metricLut
+from ._pos import Pos
+
+
+@final
+class ProbeSet:
+	def __init__(self, probes: Sequence[tuple[Pos, Color]], *, radius: int = 0) -> None:
+		"""
+		positions and their expected colors, compiled once into index arrays
+		so a frame can check all of them in a single numpy operation
+
+		@param radius sample the mean color of the (2 * radius + 1)² patch around each position instead of a single pixel
+		"""
+
+		if radius < 0:
+			raise ValueError(f"radius must not be negative (got {radius})")
+
+		self._probes = tuple(probes)
+		self.radius = radius
+
+		self.ys: numpy.ndarray = numpy.array([pos.y for pos, _ in self._probes], dtype=numpy.intp)
+		self.xs: numpy.ndarray = numpy.array([pos.x for pos, _ in self._probes], dtype=numpy.intp)
+		self.colors: numpy.ndarray = numpy.array([color.tpl for _, color in self._probes], dtype=numpy.int32).reshape(-1, 3)
+		# frames are stored as BGR
+		self.bgr: numpy.ndarray = numpy.ascontiguousarray(self.colors[:, ::-1])
+
+		self._flat: dict[int, numpy.ndarray] = {}
+		self._patches: dict[tuple[int, int], tuple[numpy.ndarray, ...]] = {}
+		self._converted: dict[Metric, numpy.ndarray] = {}
+
+	def flatIndex(self, width: int) -> numpy.ndarray:
+		"""@return indices of the probes into a frame of `width` flattened to (height * width, 3)"""
+		if (idx := self._flat.get(width)) is None:
+			idx = self._flat[width] = self.ys * width + self.xs
+		return idx
+
+	def converted(self, metric: Metric) -> numpy.ndarray:
+		"""@return (N, 3) array of the expected colors in the coordinates of `metric` (see `metricLut`)"""
+		if (converted := self._converted.get(metric)) is None:
+			converted = self._converted[metric] = metricLut(metric).take(lutIndex(self.bgr), axis=0)
+		return converted
+
+	def patchCorners(self, height: int, width: int) -> tuple[numpy.ndarray, ...]:
+		"""
+		@return (y1, y2, x1, x2, area) of the patches (clipped to a frame of `height` x `width`), as indices into its integral image
+		"""
+		if (corners := self._patches.get((height, width))) is None:
+			y1 = numpy.clip(self.ys - self.radius, 0, height)
+			y2 = numpy.clip(self.ys + self.radius + 1, 0, height)
+			x1 = numpy.clip(self.xs - self.radius, 0, width)
+			x2 = numpy.clip(self.xs + self.radius + 1, 0, width)
+			area = ((y2 - y1) * (x2 - x1)).astype(numpy.int32).reshape(-1, 1)
+			corners = self._patches[(height, width)] = (y1, y2, x1, x2, area)
+		return corners
+
+	def __len__(self) -> int:
+		return len(self._probes)
+
+	def __iter__(self) -> Iterator[tuple[Pos, Color]]:
+		return iter(self._probes)
+
+	def __str__(self) -> str:
+		desc = ", ".join(f"{c} at {p}" for p, c in self._probes)
+		return desc if self.radius == 0 else f"{desc} (radius: {self.radius})"
@@ -0,0 +1,133 @@
+import logging
+import queue
+from enum import IntEnum
+from threading import Thread
+from typing import final
+from typing import Optional
+
+import cv2
+import numpy
+
+from ._logging import log
+
+
+_THREAD_VIDWRITE = "Thread-VideoWriter"
+
+
+@final
+class DropPolicy(IntEnum):
+	DropNewest = 0
+	"""keep what is queued, skip the incoming frame"""
+	DropOldest = 1
+	"""overwrite the oldest queued frame with the incoming one"""
+
+
+@final
+class Recorder:
+	def __init__(self, path: str, fps: float, shape: tuple[int, ...], *, queueSize: int = 30, dropPolicy: DropPolicy = DropPolicy.DropOldest) -> None:
+		"""
+		encodes pushed frames to `path` on its own thread
+
+		@param path file to write to (MJPG encoded avi)
+		@param fps fps of the written video
+		@param shape shape of the frames that will be pushed
+		@param queueSize max amount of frames waiting to be encoded
+		@param dropPolicy what to do when the encoder falls behind by more than `queueSize` frames
+		"""
+
+		self._shape = shape
+		self._maxBuffers = queueSize
+		self._dropPolicy = dropPolicy
+
+		height, width = shape[:2]
+		self._writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height), True)
+		if not self._writer.isOpened():
+			raise OSError(f"failed to open VideoWriter for {path}")
+
+		# buffers cycle between `_free` and `_pending`, so nothing is allocated once the pool is warm
+		self._free: queue.SimpleQueue[numpy.ndarray] = queue.SimpleQueue()
+		self._pending: queue.Queue[Optional[numpy.ndarray]] = queue.Queue()
+		self._nBuffers = 0
+
+		self._pushed = 0
+		self._written = 0
+		self._dropped = 0
+
+		self._isRecording = True
+		self._thread = Thread(target=self._encode, name=_THREAD_VIDWRITE, daemon=True)
+		self._thread.start()
+
+	def _encode(self) -> None:
+		log(logging.DEBUG, f"{_THREAD_VIDWRITE} is running")
+
+		try:
+			while (buf := self._pending.get()) is not None:
+				self._writer.write(buf)
+				self._written += 1
+				self._free.put(buf)
+		except Exception as e:
+			log(logging.ERROR, f"{_THREAD_VIDWRITE} has crashed: {e}")
+		finally:
+			log(logging.DEBUG, f"{_THREAD_VIDWRITE} is stopping")
+			self._writer.release()
+
+	def _buffer(self) -> Optional[numpy.ndarray]:
+		try:
+			return self._free.get_nowait()
+		except queue.Empty:
+			pass
+
+		if self._nBuffers < self._maxBuffers:
+			self._nBuffers += 1
+			return numpy.empty(self._shape, dtype=numpy.uint8)
+		elif self._dropPolicy == DropPolicy.DropOldest:
+			try:
+				buf = self._pending.get_nowait()
+			except queue.Empty:
+				# every buffer is being encoded right now
+				return None
+			else:
+				if buf is not None:
+					self._dropped += 1
+					return buf
+				self._pending.put(None)
+		return None
+
+	def push(self, frame: numpy.ndarray) -> None:
+		"""queue a copy of `frame` for encoding; never blocks"""
+		if self._isRecording is False:
+			return
+
+		self._pushed += 1
+
+		if frame.shape != self._shape or (buf := self._buffer()) is None:
+			self._dropped += 1
+			return
+
+		numpy.copyto(buf, frame)
+		self._pending.put(buf)
+
+	def stop(self) -> None:
+		"""encode everything still queued and close the file"""
+		if self._isRecording is False:
+			return
+
+		self._isRecording = False
+		self._pending.put(None)
+		self._thread.join()
+
+	@property
+	def isRecording(self) -> bool:
+		return self._isRecording
+
+	@property
+	def pushed(self) -> int:
+		return self._pushed
+
+	@property
+	def written(self) -> int:
+		return self._written
+
+	@property
+	def dropped(self) -> int:
+		return self._dropped
@@ -0,0 +1,201 @@
+import collections
+import logging
+import queue
+import threading
+from threading import Thread
+from typing import Any
+from typing import Callable
+from typing import final
+from typing import NamedTuple
+from typing import Optional
+from typing import Union
+
+import numpy
+import serial
+
+from ._logging import log
+from ._recorder import DropPolicy
+from ._timing import Clock
+from ._timing import SYSTEM_CLOCK
+
+
+_THREAD_SERIAL = "Thread-SerialWriter"
+
+# upper edges (in ms) of the write latency histogram buckets, the last one is open
+_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100)
+
+
+@final
+class SerialCommand(NamedTuple):
+	data: bytes
+	# `Clock.now` when it was queued and when it was on the wire
+	queued: int
+	written: int
+
+
+@final
+class SerialWriter:
+	def __init__(self, port: Union[str, serial.Serial], baudRate: int = 9600, *, queueSize: int = 64, dropPolicy: DropPolicy = DropPolicy.DropOldest, history: int = 10_000, clock: Clock = SYSTEM_CLOCK) -> None:
+		"""
+		writes to the controller on its own thread, so callers never wait for the UART
+
+		@param port serial port to open (or an already opened one)
+		@param baudRate baud rate of the port (ignored if `port` is already opened)
+		@param queueSize max amount of commands waiting to be written
+		@param dropPolicy which command to drop when `queueSize` are waiting; every command is the state to hold,
+			so dropping the oldest still ends up in the state last written
+		@param history amount of written commands kept (oldest are dropped)
+		@param clock commands are timestamped with (the same as the one of the script writing them)
+		"""
+
+		self._ser: serial.Serial = serial.Serial(port, baudRate) if isinstance(port, str) else port
+		self._clock = clock
+
+		self._queue: queue.Queue[Optional[tuple[bytes, int]]] = queue.Queue(maxsize=queueSize)
+		self._dropPolicy = dropPolicy
+		self._history: collections.deque[SerialCommand] = collections.deque(maxlen=history)
+		self._historyLock = threading.Lock()
+
+		self._latencies = numpy.zeros(len(_LATENCY_BUCKETS) + 1, dtype=numpy.int64)
+		self._depths = numpy.zeros(queueSize + 1, dtype=numpy.int64)
+		self._latencySum = 0
+		self._latencyMax = 0
+		self._dropped = 0
+		self._failures = 0
+		self._queuedBytes = 0
+		self._writtenBytes = 0
+		self._closed = False
+		# replaced instead of modified, so `write` can go through them without a lock
+		self._listeners: tuple[Callable[[bytes], None], ...] = ()
+
+		self._thread = Thread(target=self._write, name=_THREAD_SERIAL, daemon=True)
+		self._thread.start()
+
+	def _write(self) -> None:
+		log(logging.DEBUG, f"{_THREAD_SERIAL} is running")
+
+		try:
+			while (cmd := self._queue.get()) is not None:
+				data, queued = cmd
+				try:
+					self._ser.write(data)
+					self._ser.flush()
+				except serial.SerialException as e:
+					self._failures += 1
+					log(logging.WARNING, f"failed to write {data!r}: {e}")
+					continue
+
+				written = self._clock.now()
+				latency = written - queued
+				self._latencies[numpy.searchsorted(_LATENCY_BUCKETS, latency / 1e6)] += 1
+				self._latencySum += latency
+				self._latencyMax = max(self._latencyMax, latency)
+
+				with self._historyLock:
+					self._history.append(SerialCommand(data, queued, written))
+				self._writtenBytes += len(data)
+				self._clock.notify()
+		except Exception as e:
+			log(logging.ERROR, f"{_THREAD_SERIAL} has crashed: {e}")
+		finally:
+			log(logging.DEBUG, f"{_THREAD_SERIAL} is stopping")
+
+	def write(self, data: bytes) -> None:
+		"""queue `data` to be written; never blocks, a full queue drops a command (see `dropPolicy`)"""
+		for listener in self._listeners:
+			listener(data)
+
+		self._depths[min(self._queue.qsize(), len(self._depths) - 1)] += 1
+		cmd = (data, self._clock.now())
+		while True:
+			try:
+				self._queue.put_nowait(cmd)
+				break
+			except queue.Full:
+				pass
+
+			if self._dropPolicy == DropPolicy.DropNewest:
+				self._dropped += 1
+				return
+
+			try:
+				oldest = self._queue.get_nowait()
+			except queue.Empty:
+				# written meanwhile
+				continue
+			if oldest is not None:
+				self._dropped += 1
+				self._queuedBytes -= len(oldest[0])
+
+		self._queuedBytes += len(data)
+
+	def listen(self, listener: Callable[[bytes], None]) -> None:
+		"""call `listener` with everything passed to `write`, on the writing thread before it is queued"""
+		self._listeners += (listener,)
+
+	def unlisten(self, listener: Callable[[bytes], None]) -> None:
+		self._listeners = tuple(fn for fn in self._listeners if fn != listener)
+
+	def close(self) -> None:
+		"""write the queued commands, then close the port"""
+		if self._closed is True:
+			return
+		self._closed = True
+
+		if self._thread.is_alive():
+			self._queue.put(None)
+			self._thread.join()
+		self._ser.close()
+
+	@property
+	def written(self) -> int:
+		return int(self._latencies.sum())
+
+	@property
+	def queuedBytes(self) -> int:
+		"""bytes queued so far, written or not (without dropped ones)"""
+		return self._queuedBytes
+
+	@property
+	def writtenBytes(self) -> int:
+		"""bytes on the wire so far"""
+		return self._writtenBytes
+
+	@property
+	def dropped(self) -> int:
+		"""commands dropped because the queue was full"""
+		return self._dropped
+
+	def history(self, since: int = 0) -> tuple[SerialCommand, ...]:
+		"""@return the written commands queued at or after `since` (see `Clock.now`)"""
+		with self._historyLock:
+			return tuple(c for c in self._history if c.queued >= since)
+
+	def latencyHistogram(self) -> tuple[tuple[str, int], ...]:
+		"""@return (upper edge, count) of the time from queueing to writing"""
+		edges = tuple(f"<={e}ms" for e in _LATENCY_BUCKETS) + (f">{_LATENCY_BUCKETS[-1]}ms",)
+		return tuple(zip(edges, self._latencies.tolist()))
+
+	def depthHistogram(self) -> tuple[tuple[int, int], ...]:
+		"""@return (depth, count) of the amount of commands already queued when one was queued"""
+		return tuple((depth, n) for depth, n in enumerate(self._depths.tolist()) if n > 0)
+
+	def _latencyPercentile(self, p: float) -> str:
+		counts = numpy.cumsum(self._latencies)
+		if counts[-1] == 0:
+			return "-"
+		idx = int(numpy.searchsorted(counts, p * counts[-1]))
+		return f"<={_LATENCY_BUCKETS[idx]}ms" if idx < len(_LATENCY_BUCKETS) else f">{_LATENCY_BUCKETS[-1]}ms"
+
+	def stats(self) -> tuple[tuple[str, Any], ...]:
+		n = self.written
+		depths = numpy.arange(len(self._depths))
+		queued = self._depths.sum()
+		depthAvg = float((self._depths * depths).sum() / (queued or 1))
+		depthMax = int(depths[self._depths > 0].max()) if queued > 0 else 0
+
+		return (
+			("Serial writes (failed/dropped)", f"{n} ({self._failures}/{self._dropped})"),
+			("Serial latency (avg/p99/max)", f"{self._latencySum / (n or 1) / 1e6:.2f}ms | {self._latencyPercentile(0.99)} | {self._latencyMax / 1e6:.2f}ms"),
+			("Serial queue depth (avg/max)", f"{depthAvg:.2f} | {depthMax}"),
+		)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import final
+from typing import Optional
+from typing import Union
+
+import numpy
+
+from ._color import Color
+from ._color import Metric
+from ._frame import Frame
+from ._pos import Pos
+from ._probe import ProbeSet
+
+
+@final
+class ScreenSignature:
+	def __init__(
+		self,
+		probes: Union[ProbeSet, Sequence[tuple[Pos, Color]]],
+		*,
+		tolerance: Union[int, Sequence[int]] = 0,
+		quorum: Optional[int] = None,
+		radius: int = 0,
+		metric: Metric = Metric.RGB,
+		name: Optional[str] = None,
+	) -> None:
+		"""
+		identifies a screen by the colors at a few positions
+
+		@param probes positions and their expected colors
+		@param tolerance max distance (see `Color.distance`, in `metric`) per probe, or one for all of them
+		@param quorum amount of probes that have to match (default: all)
+		@param radius compare the mean color of a patch around each position (see `ProbeSet`; ignored if `probes` is a `ProbeSet`)
+		@param metric color space the distances are measured in
+		@param name used in logs and errors instead of listing every probe
+		"""
+
+		self.probes: ProbeSet = probes if isinstance(probes, ProbeSet) else ProbeSet(probes, radius=radius)
+		self.tolerances: numpy.ndarray = numpy.broadcast_to(numpy.asarray(tolerance, dtype=numpy.int32), (len(self.probes),)).copy()
+		self.quorum: int = len(self.probes) if quorum is None else quorum
+		self.metric = metric
+		self.name = name
+
+		if not 0 < self.quorum <= len(self.probes):
+			raise ValueError(f"quorum must be between 1 and {len(self.probes)} (got {self.quorum})")
+
+	def withQuorum(self, quorum: int) -> ScreenSignature:
+		"""@return the same probes (sharing the compiled arrays), matching once `quorum` of them match"""
+		return ScreenSignature(self.probes, tolerance=self.tolerances, quorum=quorum, metric=self.metric, name=self.name)
+
+	def withTolerance(self, tolerance: Union[int, Sequence[int]]) -> ScreenSignature:
+		return ScreenSignature(self.probes, tolerance=tolerance, quorum=self.quorum, metric=self.metric, name=self.name)
+
+	def distances(self, frame: Frame) -> numpy.ndarray:
+		return frame.distancesTo(self.probes, self.metric)
+
+	def matches(self, distances: numpy.ndarray) -> bool:
+		"""@param distances result of `self.distances`"""
+		return bool(numpy.count_nonzero(distances <= self.tolerances) >= self.quorum)
+
+	def __call__(self, frame: Frame) -> bool:
+		return self.matches(self.distances(frame))
+
+	def __str__(self) -> str:
+		if self.name is not None:
+			return self.name
+
+		desc = f"colors ({self.probes})"
+		if self.tolerances.any():
+			desc += f" (distance: {', '.join(str(t) for t in numpy.unique(self.tolerances).tolist())})"
+		if self.metric is not Metric.RGB:
+			desc += f" ({self.metric.name})"
+		if self.quorum != len(self.probes):
+			desc += f" ({self.quorum} of {len(self.probes)})"
+		return desc
@@ -0,0 +1,187 @@
+import logging
+from typing import Any
+from typing import Callable
+from typing import final
+from typing import NamedTuple
+from typing import Optional
+from typing import Union
+
+import numpy
+
+from ._button import Button
+from ._color import Color
+from ._emulator import Emulator
+from ._logging import log
+from ._pos import Rect
+from ._source import FrameSource
+from ._timing import Clock
+from ._timing import now
+from ._timing import SYSTEM_CLOCK
+
+
+@final
+class SimulationScreen(NamedTuple):
+	background: Color
+	# filled on top of the background, in order
+	regions: tuple[tuple[Rect, Color], ...] = ()
+	# draws onto the painted (BGR) frame, gets the seconds since the state was entered
+	animate: Optional[Callable[[numpy.ndarray, float], None]] = None
+
+
+@final
+class SimulationState(NamedTuple):
+	screen: SimulationScreen
+	# pressing a button moves to the named state
+	presses: tuple[tuple[Button, str], ...] = ()
+	# (seconds, state) to move to after being in this one for that long; a callable is asked for the seconds on every entry
+	timeout: Optional[tuple[Union[float, Callable[[], float]], str]] = None
+
+
+class Simulation:
+	def __init__(self, states: dict[str, SimulationState], start: str, *, anywhere: tuple[tuple[Button, str], ...] = ()) -> None:
+		"""
+		state machine of what a game shows, driven by button presses and the time spent in each state
+
+		@param start state to start in
+		@param anywhere presses handled in every state (e.g. the HOME button), unless the state handles the button itself
+		"""
+
+		targets = {start} | {s for _, s in anywhere}
+		for state in states.values():
+			targets.update(s for _, s in state.presses)
+			if state.timeout is not None:
+				targets.add(state.timeout[1])
+		if len(unknown := targets - states.keys()) > 0:
+			raise ValueError(f"unknown states: {', '.join(sorted(unknown))}")
+
+		self._states = states
+		self._transitions: dict[str, dict[Button, str]] = {name: dict(anywhere) | dict(state.presses) for name, state in states.items()}
+
+		self._presses = 0
+		self._ignored = 0
+
+		self._start = start
+		self._name = start
+		self._entered = 0
+		# (time, state) the timeout of the current state moves to
+		self._timeout: Optional[tuple[int, str]] = None
+		# static part of every screen shown so far, painted once
+		self._painted: dict[str, numpy.ndarray] = {}
+		self.restart(now())
+
+	def restart(self, t: int) -> None:
+		"""enter the start state at `t` (see `Clock.now`)"""
+		self._enter(self._start, t)
+
+	def _enter(self, name: str, t: int) -> None:
+		self._name = name
+		self._entered = t
+
+		if (timeout := self._states[name].timeout) is not None:
+			seconds, target = timeout
+			self._timeout = (t + round((seconds() if callable(seconds) else seconds) * 1e9), target)
+		else:
+			self._timeout = None
+
+		log(logging.DEBUG, f"simulation: {name}")
+
+	def advance(self, t: int) -> None:
+		"""follow the timeouts up to `t` (see `Clock.now`)"""
+		while (timeout := self._timeout) is not None and timeout[0] <= t:
+			self._enter(timeout[1], timeout[0])
+
+	def press(self, button: Button, t: int) -> bool:
+		"""
+		@param t time `button` was pressed at (see `Clock.now`)
+		@return whether the press did anything in the current state
+		"""
+		self.advance(t)
+		self._presses += 1
+
+		if (name := self._transitions[self._name].get(button)) is None:
+			self._ignored += 1
+			return False
+
+		self._enter(name, t)
+		return True
+
+	@property
+	def state(self) -> str:
+		return self._name
+
+	def render(self, out: numpy.ndarray, t: int) -> None:
+		"""paint the state at `t` (see `Clock.now`) into the BGR frame `out`"""
+		self.advance(t)
+		screen = self._states[self._name].screen
+
+		if (painted := self._painted.get(self._name)) is None or painted.shape != out.shape:
+			painted = self._painted[self._name] = numpy.empty_like(out)
+			painted[:] = screen.background.tpl[::-1]
+			for (x, y, w, h), color in screen.regions:
+				painted[y:y + h, x:x + w] = color.tpl[::-1]
+		numpy.copyto(out, painted)
+
+		if screen.animate is not None:
+			screen.animate(out, (t - self._entered) / 1e9)
+
+	def stats(self) -> tuple[tuple[str, Any], ...]:
+		return (
+			("Simulated presses (ignored)", f"{self._presses} ({self._ignored})"),
+			("Simulated state", self._name),
+		)
+
+
+@final
+class SimulatorSource(FrameSource):
+	def __init__(self, simulation: Simulation, emulator: Emulator, *, width: int = 768, height: int = 480, fps: float = 30, clock: Clock = SYSTEM_CLOCK) -> None:
+		"""
+		renders `simulation` as if it was captured from the console, pressing what `emulator` receives;
+		closes the loop script -> `SerialWriter` -> `Emulator` -> `Simulation` -> `Capture` -> script
+
+		@param clock frames are paced on (the same as the one of `emulator`)
+		"""
+
+		self._simulation = simulation
+		self._emulator = emulator
+		self._shape = (height, width, 3)
+		self._fps = fps
+		self._clock = clock
+
+		self._held = Button.EMPTY
+		# timestamp of the last byte handled and how many of those received at it were; on a `VirtualClock` many share one
+		self._since = clock.now()
+		self._consumed = 0
+		simulation.restart(self._since)
+
+		self._idx = 0
+		self._tStart = self._since
+
+	def read(self, out: numpy.ndarray) -> tuple[bool, numpy.ndarray]:
+		self._clock.sleepUntil(self._tStart + round(self._idx * 1e9 / self._fps))
+		self._idx += 1
+
+		# every change to another button is a press, even if it was released again between two frames
+		for event in self._emulator.events(self._since)[self._consumed:]:
+			if event.held is not self._held and event.held is not Button.EMPTY:
+				self._simulation.press(event.held, event.timestamp)
+			self._held = event.held
+
+			if event.timestamp != self._since:
+				self._since, self._consumed = event.timestamp, 0
+			self._consumed += 1
+
+		if out.shape != self._shape:
+			out = numpy.empty(self._shape, dtype=numpy.uint8)
+
+		self._simulation.render(out, self._clock.now())
+		return True, out
+
+	def release(self) -> None:
+		pass
+
+	@property
+	def fps(self) -> float:
+		return self._fps
+
+	def stats(self) -> tuple[tuple[str, Any], ...]:
+		return self._simulation.stats()
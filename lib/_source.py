@@ -0,0 +1,207 @@
+import pathlib
+import time
+from abc import abstractmethod
+from typing import Any
+from typing import final
+from typing import Optional
+from typing import Union
+
+import cv2
+import numpy
+
+from ._timing import Clock
+from ._timing import SYSTEM_CLOCK
+
+
+_IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg")
+
+
+class FrameSource:
+	"""Something `Capture` can decode frames from"""
+
+	@abstractmethod
+	def read(self, out: numpy.ndarray) -> tuple[bool, numpy.ndarray]:
+		"""
+		decode the next frame, into `out` if its shape matches
+
+		@return (ok, frame)
+		"""
+		raise NotImplementedError
+
+	@abstractmethod
+	def release(self) -> None:
+		raise NotImplementedError
+
+	@property
+	@abstractmethod
+	def fps(self) -> float:
+		raise NotImplementedError
+
+	@property
+	def exhausted(self) -> bool:
+		"""no more frames will ever be produced"""
+		return False
+
+	@property
+	def timestamp(self) -> Optional[int]:
+		"""when the frame last read was captured (see `_timing.now`), if it is known to be earlier than the read"""
+		return None
+
+	def stats(self) -> tuple[tuple[str, Any], ...]:
+		return tuple()
+
+
+# a grab returning faster than this fraction of the frame period was already buffered
+_BUFFERED_GRAB = 0.25
+# upper bound of stale frames skipped per read
+_MAX_DRAIN = 8
+
+
+@final
+class CameraSource(FrameSource):
+	def __init__(self, camID: int, width: int, height: int, fps: int, *, lowLatency: bool = False) -> None:
+		"""
+		@param lowLatency keep driver buffers minimal and skip stale buffered frames, so the newest frame is always returned
+		"""
+
+		self._fps = fps
+		self._lowLatency = lowLatency
+
+		self.vid = cv2.VideoCapture(camID)
+		self.vid.set(cv2.CAP_PROP_FPS, fps)
+		self.vid.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+		self.vid.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+		if lowLatency is True:
+			# not every backend supports it; draining below covers the rest
+			self.vid.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+		self._tBuffered = _BUFFERED_GRAB / fps
+		self._drained = 0
+		self._grabs = 0
+		self._grabWait = 0.0
+
+	def read(self, out: numpy.ndarray) -> tuple[bool, numpy.ndarray]:
+		if self._lowLatency is False:
+			return self.vid.read(out)
+
+		for i in range(_MAX_DRAIN + 1):
+			t0 = time.perf_counter()
+			if not self.vid.grab():
+				return False, out
+			tWait = time.perf_counter() - t0
+
+			self._grabs += 1
+			self._grabWait += tWait
+
+			# a grab that had to wait delivered a frame that was captured just now
+			if tWait >= self._tBuffered:
+				break
+			elif i != _MAX_DRAIN:
+				self._drained += 1
+
+		return self.vid.retrieve(out)
+
+	def stats(self) -> tuple[tuple[str, Any], ...]:
+		if self._lowLatency is False:
+			return tuple()
+
+		return (
+			("Drained frames", self._drained),
+			("Avg. grab wait", f"{self._grabWait / (self._grabs or 1) * 1000:.1f}ms"),
+		)
+
+	def release(self) -> None:
+		if self.vid.isOpened():
+			self.vid.release()
+
+	@property
+	def fps(self) -> float:
+		return self._fps
+
+
+@final
+class ReplaySource(FrameSource):
+	def __init__(self, path: Union[str, pathlib.Path], *, paced: bool = True, loop: bool = False, fps: Optional[float] = None, clock: Clock = SYSTEM_CLOCK) -> None:
+		"""
+		@param path video file or directory of images (replayed in name order)
+		@param paced replay at the recorded fps instead of as fast as possible
+		@param loop start over at the end
+		@param fps override the fps (required to pace image directories, defaults to 30 for those)
+		@param clock frames are paced on (the same as the one of the `Capture` reading them)
+		"""
+
+		self._path = pathlib.Path(path)
+		self._paced = paced
+		self._clock = clock
+		self._loop = loop
+
+		self._vid: Optional[cv2.VideoCapture] = None
+		self._images: tuple[pathlib.Path, ...] = ()
+
+		if self._path.is_dir():
+			self._images = tuple(sorted(p for p in self._path.iterdir() if p.suffix.lower() in _IMAGE_SUFFIXES))
+			if len(self._images) == 0:
+				raise FileNotFoundError(f"no images found in {self._path}")
+			self._fps = fps or 30.0
+		else:
+			self._vid = cv2.VideoCapture(str(self._path))
+			if not self._vid.isOpened():
+				raise FileNotFoundError(f"failed to open {self._path}")
+			self._fps = fps or self._vid.get(cv2.CAP_PROP_FPS) or 30.0
+
+		self._exhausted = False
+		self._idx = 0
+		self._tStart = clock.now()
+
+	def _next(self, out: numpy.ndarray) -> tuple[bool, numpy.ndarray]:
+		if self._vid is not None:
+			return self._vid.read(out)
+		elif self._idx >= len(self._images):
+			return False, out
+
+		img = cv2.imread(str(self._images[self._idx]), cv2.IMREAD_COLOR)
+		if img is None:
+			return False, out
+		elif img.shape == out.shape:
+			numpy.copyto(out, img)
+			return True, out
+		else:
+			return True, img
+
+	def _rewind(self) -> None:
+		if self._vid is not None:
+			self._vid.set(cv2.CAP_PROP_POS_FRAMES, 0)
+		self._idx = 0
+		self._tStart = self._clock.now()
+
+	def read(self, out: numpy.ndarray) -> tuple[bool, numpy.ndarray]:
+		if self._exhausted is True:
+			return False, out
+
+		if self._paced is True:
+			self._clock.sleepUntil(self._tStart + round(self._idx * 1e9 / self._fps))
+
+		ok, frame = self._next(out)
+		if ok is False:
+			if self._loop is False:
+				self._exhausted = True
+				return False, out
+
+			self._rewind()
+			ok, frame = self._next(out)
+
+		self._idx += 1
+		return ok, frame
+
+	def release(self) -> None:
+		if self._vid is not None and self._vid.isOpened():
+			self._vid.release()
+
+	@property
+	def fps(self) -> float:
+		return self._fps
+
+	@property
+	def exhausted(self) -> bool:
+		return self._exhausted
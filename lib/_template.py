@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import pathlib
+from typing import final
+from typing import NamedTuple
+from typing import Optional
+from typing import TYPE_CHECKING
+from typing import Union
+
+import cv2
+import numpy
+
+from ._pos import Pos
+from ._pos import Rect
+
+if TYPE_CHECKING:
+	from ._frame import Frame
+
+
+# coarsest pyramid level still has to be this many pixels wide/high to match reliably
+_MIN_LEVEL_SIZE = 8
+
+
+@final
+class Match(NamedTuple):
+	pos: Pos
+	score: float
+
+	def __str__(self) -> str:
+		return f"{self.pos} ({self.score:.3f})"
+
+
+@final
+class Template:
+	def __init__(
+		self,
+		image: Union[str, pathlib.Path, numpy.ndarray],
+		*,
+		roi: Optional[Rect] = None,
+		threshold: float = 0.9,
+		levels: int = 2,
+		name: Optional[str] = None,
+	) -> None:
+		"""
+		an image to search frames for; loaded and downscaled once
+
+		the search runs coarse to fine: the whole region of interest is only scanned at the
+		coarsest pyramid level, the full resolution one just around the best coarse match
+
+		@param image image file (or BGR data) of the template
+		@param roi region searched by default (default: whole frame)
+		@param threshold min normalized correlation (-1 - 1) of a match
+		@param levels max amount of times the template and frame are halved for the coarse search
+		@param name used in logs and errors instead of the path
+		"""
+
+		if isinstance(image, numpy.ndarray):
+			data = image
+			self.name = name or f"template {image.shape[1]}x{image.shape[0]}"
+		else:
+			data = cv2.imread(str(image), cv2.IMREAD_COLOR)
+			if data is None:
+				raise FileNotFoundError(f"failed to load template {image}")
+			self.name = name or pathlib.Path(image).stem
+
+		if data.std() < 1:
+			# normalized correlation is undefined for it, every position would score the same
+			raise ValueError(f"{self.name} has no contrast, use a `ScreenSignature` instead")
+
+		self.roi = roi
+		self.threshold = threshold
+
+		self._pyramid: list[numpy.ndarray] = [numpy.ascontiguousarray(data)]
+		while len(self._pyramid) <= levels and min(self._pyramid[-1].shape[:2]) >= 2 * _MIN_LEVEL_SIZE:
+			self._pyramid.append(cv2.pyrDown(self._pyramid[-1]))
+
+	@property
+	def width(self) -> int:
+		return self._pyramid[0].shape[1]
+
+	@property
+	def height(self) -> int:
+		return self._pyramid[0].shape[0]
+
+	@property
+	def levels(self) -> int:
+		"""amount of downscaled levels actually used (limited by the template size)"""
+		return len(self._pyramid) - 1
+
+	def _region(self, frame: numpy.ndarray, roi: Optional[Rect]) -> tuple[numpy.ndarray, int, int]:
+		if roi is None:
+			return frame, 0, 0
+
+		x1, y1 = max(roi.x, 0), max(roi.y, 0)
+		x2, y2 = min(roi.x + roi.width, frame.shape[1]), min(roi.y + roi.height, frame.shape[0])
+		return frame[y1:y2, x1:x2], x1, y1
+
+	def search(self, frame: numpy.ndarray, roi: Optional[Rect] = None) -> Optional[Match]:
+		"""
+		@param frame BGR image data
+		@param roi region to search (default: the template's)
+		@return best match (top left corner in frame coordinates), even if it is below the threshold,
+			or None if the region is smaller than the template
+		"""
+		region, xOff, yOff = self._region(frame, roi or self.roi)
+		if region.shape[0] < self.height or region.shape[1] < self.width:
+			return None
+
+		level = self.levels
+		# the downscaled region has to fit the downscaled template
+		while level > 0 and (region.shape[0] >> level < self._pyramid[level].shape[0] or region.shape[1] >> level < self._pyramid[level].shape[1]):
+			level -= 1
+
+		if level > 0:
+			coarse = region
+			for _ in range(level):
+				coarse = cv2.pyrDown(coarse)
+			_, _, _, (x, y) = cv2.minMaxLoc(cv2.matchTemplate(coarse, self._pyramid[level], cv2.TM_CCOEFF_NORMED))
+
+			# refine within one coarse pixel (plus rounding of the downscaling) around the coarse match
+			margin = (1 << level) + 1
+			x1, y1 = max((x << level) - margin, 0), max((y << level) - margin, 0)
+			x2 = min((x << level) + margin + self.width, region.shape[1])
+			y2 = min((y << level) + margin + self.height, region.shape[0])
+			region, xOff, yOff = region[y1:y2, x1:x2], xOff + x1, yOff + y1
+
+		_, score, _, (x, y) = cv2.minMaxLoc(cv2.matchTemplate(region, self._pyramid[0], cv2.TM_CCOEFF_NORMED))
+		return Match(Pos(xOff + x, yOff + y), score)
+
+	def find(self, frame: numpy.ndarray, roi: Optional[Rect] = None) -> Optional[Match]:
+		"""@return the best match in `roi` (default: the template's) if it reaches the threshold"""
+		if (match := self.search(frame, roi)) is not None and match.score >= self.threshold:
+			return match
+		return None
+
+	def __call__(self, frame: Frame) -> bool:
+		return frame.find(self) is not None
+
+	def __str__(self) -> str:
+		return self.name if self.roi is None else f"{self.name} in {self.roi}"
@@ -0,0 +1,269 @@
+import math
+import threading
+import time
+from abc import abstractmethod
+from threading import Thread
+from typing import Any
+from typing import Callable
+from typing import Final
+from typing import final
+from typing import Optional
+
+
+# the last stretch before a deadline is spun instead of slept, sleeps overshoot by up to a scheduler tick
+_SPIN_NS = 1_500_000
+
+
+def now() -> int:
+	"""monotonic time in ns (unaffected by wall clock adjustments)"""
+	return time.perf_counter_ns()
+
+
+def sleepUntil(deadline: int) -> int:
+	"""
+	sleep coarsely until shortly before `deadline` (see `now`), then spin
+
+	@return how late it returned (ns)
+	"""
+	while (left := deadline - time.perf_counter_ns()) > _SPIN_NS:
+		time.sleep((left - _SPIN_NS) / 1e9)
+
+	while (t := time.perf_counter_ns()) < deadline:
+		# yield the GIL to the capture threads while spinning
+		time.sleep(0)
+
+	return t - deadline
+
+
+class Clock:
+	"""source of time for everything that waits on or measures it"""
+
+	@abstractmethod
+	def now(self) -> int:
+		"""monotonic time in ns"""
+		raise NotImplementedError
+
+	def time(self) -> float:
+		"""`now` in seconds"""
+		return self.now() / 1e9
+
+	@abstractmethod
+	def sleepUntil(self, deadline: int) -> int:
+		"""
+		@param deadline see `now`
+		@return how late it returned (ns)
+		"""
+		raise NotImplementedError
+
+	@abstractmethod
+	def waitFor(self, cond: threading.Condition, predicate: Callable[[], bool], timeout: Optional[float]) -> bool:
+		"""`cond.wait_for` (`cond` must be held) with `timeout` in seconds of this clock"""
+		raise NotImplementedError
+
+	@abstractmethod
+	def waitEvent(self, event: threading.Event, timeout: Optional[float]) -> bool:
+		"""`event.wait` with `timeout` in seconds of this clock"""
+		raise NotImplementedError
+
+	def attach(self, thread: Thread) -> None:
+		"""take part in time with `thread` (before starting it); only matters for a `VirtualClock`"""
+
+	def notify(self) -> None:
+		"""something a `waitFor` or `waitEvent` may wait on changed; only matters for a `VirtualClock`"""
+
+
+@final
+class SystemClock(Clock):
+	"""the actual time (see `now`)"""
+
+	def now(self) -> int:
+		return now()
+
+	def sleepUntil(self, deadline: int) -> int:
+		return sleepUntil(deadline)
+
+	def waitFor(self, cond: threading.Condition, predicate: Callable[[], bool], timeout: Optional[float]) -> bool:
+		return cond.wait_for(predicate, timeout)
+
+	def waitEvent(self, event: threading.Event, timeout: Optional[float]) -> bool:
+		return event.wait(timeout)
+
+
+SYSTEM_CLOCK: Final[SystemClock] = SystemClock()
+
+
+# real time a waiter sleeps before checking again whether time can pass (in case nobody notified it)
+_VIRTUAL_POLL = 0.005
+
+
+@final
+class VirtualClock(Clock):
+	def __init__(self) -> None:
+		"""
+		time that only passes while every attached thread waits on it, then jumps straight to the earliest deadline;
+		waits take no real time and the same inputs always give the same timings
+
+		the creating thread is attached, every other thread waiting on the clock for the attached ones
+		(e.g. the capture thread for the script's presses) must be attached with `attach`;
+		threads that aren't attached (e.g. the preview) may still wait on it, but never hold it up
+		"""
+
+		self._now = 0
+		self._cond = threading.Condition()
+		self._attached: list[Thread] = [threading.current_thread()]
+		# deadline (or None) and predicate (or None) of every thread waiting
+		self._waiting: dict[Thread, tuple[Optional[int], Optional[Callable[[], bool]]]] = {}
+		self._holds: list[Callable[[], bool]] = []
+		self._stopped = False
+		self._jumps = 0
+
+	def now(self) -> int:
+		return self._now
+
+	def attach(self, thread: Thread) -> None:
+		with self._cond:
+			self._attached.append(thread)
+
+	def holdWhile(self, predicate: Callable[[], bool]) -> None:
+		"""don't let time pass while `predicate` holds (e.g. while commands are on their way to a simulated device)"""
+		with self._cond:
+			self._holds.append(predicate)
+
+	def notify(self) -> None:
+		with self._cond:
+			self._cond.notify_all()
+
+	def stop(self) -> None:
+		"""let every wait return as soon as its deadline is due, no matter what the attached threads do (e.g. to shut down)"""
+		with self._cond:
+			self._stopped = True
+			self._cond.notify_all()
+
+	@property
+	def jumps(self) -> int:
+		"""how often time passed"""
+		return self._jumps
+
+	def _advance(self) -> bool:
+		# `_cond` is held
+		# unstarted threads will take part as soon as they run
+		self._attached = [t for t in self._attached if t.ident is None or t.is_alive()]
+		if self._stopped is False:
+			if any(t not in self._waiting for t in self._attached):
+				return False
+			elif any(self._due(deadline, predicate) for t, (deadline, predicate) in self._waiting.items() if t in self._attached):
+				# someone is about to wake up and do something
+				self._cond.notify_all()
+				return False
+			elif any(hold() for hold in self._holds):
+				return False
+
+		deadlines = tuple(deadline for deadline, _ in self._waiting.values() if deadline is not None and deadline > self._now)
+		if len(deadlines) == 0:
+			return False
+
+		self._now = max(self._now, min(deadlines))
+		self._jumps += 1
+		self._cond.notify_all()
+		return True
+
+	def _due(self, deadline: Optional[int], predicate: Optional[Callable[[], bool]]) -> bool:
+		return (predicate is not None and predicate()) or (deadline is not None and self._now >= deadline)
+
+	def _wait(self, deadline: Optional[int], predicate: Optional[Callable[[], bool]]) -> bool:
+		thread = threading.current_thread()
+		with self._cond:
+			self._waiting[thread] = (deadline, predicate)
+			try:
+				while True:
+					if predicate is not None and predicate():
+						return True
+					elif deadline is not None and self._now >= deadline:
+						return False
+					elif self._advance() is False:
+						self._cond.wait(_VIRTUAL_POLL)
+			finally:
+				del self._waiting[thread]
+
+	def _deadline(self, timeout: Optional[float]) -> Optional[int]:
+		# rounded up, a timeout of a fraction of a ns that ended up due right away would keep its caller polling with time standing still
+		return None if timeout is None else self._now + math.ceil(timeout * 1e9)
+
+	def sleepUntil(self, deadline: int) -> int:
+		self._wait(deadline, None)
+		return self._now - deadline
+
+	def waitFor(self, cond: threading.Condition, predicate: Callable[[], bool], timeout: Optional[float]) -> bool:
+		deadline = self._deadline(timeout)
+		# whoever changes what `predicate` checks doesn't hold the clock, so it's checked without `cond`
+		cond.release()
+		try:
+			return self._wait(deadline, predicate)
+		finally:
+			cond.acquire()
+
+	def waitEvent(self, event: threading.Event, timeout: Optional[float]) -> bool:
+		return self._wait(self._deadline(timeout), event.is_set)
+
+	def stats(self) -> tuple[tuple[str, Any], ...]:
+		return (("Virtual time (jumps)", f"{self.time():.1f}s ({self._jumps})"),)
+
+
+@final
+class Timeline:
+	def __init__(self, *, slack: float = 0.02, clock: Clock = SYSTEM_CLOCK) -> None:
+		"""
+		hands out back to back time slots with absolute deadlines, so waits chained
+		one after another don't add up the lateness of each of them
+
+		@param slack a slot requested at most this late (in seconds) after the previous one ended
+			still starts at its end (in the past, so it is shorter from now on); later ones start now
+		@param clock to schedule on (the system's by default)
+		"""
+
+		self._clock = clock
+		self._slack = round(slack * 1e9)
+		self._end = 0
+
+	def schedule(self, duration: float) -> tuple[int, int]:
+		"""@return (start, end) of the next slot of `duration` seconds (see `now`)"""
+		t = self._clock.now()
+		start = self._end if t - self._end <= self._slack else t
+		self._end = start + round(duration * 1e9)
+		return start, self._end
+
+	@property
+	def end(self) -> int:
+		return self._end
+
+
+@final
+class JitterStats:
+	def __init__(self) -> None:
+		"""lateness of timed events (e.g. button presses and releases) relative to their deadlines"""
+
+		self._n = 0
+		self._sum = 0
+		self._max = 0
+
+	def record(self, lateness: int) -> None:
+		self._n += 1
+		self._sum += lateness
+		self._max = max(self._max, lateness)
+
+	@property
+	def count(self) -> int:
+		return self._n
+
+	@property
+	def mean(self) -> float:
+		"""in seconds"""
+		return self._sum / (self._n or 1) / 1e9
+
+	@property
+	def max(self) -> float:
+		"""in seconds"""
+		return self._max / 1e9
+
+	def stats(self) -> tuple[tuple[str, Any], ...]:
+		return (("Input jitter (avg/max)", f"{self.mean * 1000:.2f}ms | {self.max * 1000:.2f}ms"),)
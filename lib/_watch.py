@@ -0,0 +1,54 @@
+import queue
+from typing import Callable
+from typing import final
+from typing import NamedTuple
+from typing import Optional
+
+from ._frame import Frame
+
+
+@final
+class WatchEvent(NamedTuple):
+	frameId: int
+	timestamp: int
+	state: bool
+
+
+@final
+class Watch:
+	def __init__(self, predicate: Callable[[Frame], bool]) -> None:
+		"""
+		evaluated by the capture thread on every captured frame;
+		pushes an event whenever the result of `predicate` changes
+		"""
+
+		self._predicate = predicate
+		self._state: Optional[bool] = None
+		self._fingerprint: Optional[int] = None
+		self._events: queue.SimpleQueue[WatchEvent] = queue.SimpleQueue()
+
+	def update(self, frame: Frame) -> bool:
+		"""
+		@return whether `predicate` was evaluated (it is skipped if the content didn't change since the last frame)
+		"""
+		if frame.fingerprint == self._fingerprint:
+			return False
+		self._fingerprint = frame.fingerprint
+
+		state = bool(self._predicate(frame))
+		if state != self._state:
+			self._state = state
+			self._events.put(WatchEvent(frame.id, frame.timestamp, state))
+		return True
+
+	@property
+	def state(self) -> Optional[bool]:
+		"""result for the latest frame (None until the first frame was evaluated)"""
+		return self._state
+
+	def poll(self) -> Optional[WatchEvent]:
+		"""@return the oldest unconsumed event, if any"""
+		try:
+			return self._events.get_nowait()
+		except queue.Empty:
+			return None
@@ -10,17 +10,20 @@ from typing import final
 from typing import Optional
 from typing import Type
 
-import serial
 import yaml
 
+from lib import BrokerSource
 from lib import Capture
+from lib import Clock
 from lib import DB
 from lib import ExecCrash
 from lib import ExecLock
 from lib import Frame
+from lib import FrameSource
 from lib import log
 from lib import Script
 from lib import ScriptT
+from lib import SerialWriter
 
 
 @final
@@ -29,10 +32,14 @@ class ExecShiny(Exception):
 	Found a shiny pokemon
 	"""
 
-	def __init__(self, encounter: int, encounterFrame: Frame, *args: object) -> None:
+	def __init__(self, encounter: int, encounterFrame: Frame, *args: object, features: Optional[dict[str, float]] = None) -> None:
+		"""
+		@param features measurements corroborating the shiny (e.g. sparkle energy), reported alongside it
+		"""
 		super().__init__(*args)
 		self.encounter = encounter
 		self.encounterFrame = encounterFrame
+		self.features: dict[str, float] = features or {}
 
 
 DexPath: Final[pathlib.Path] = pathlib.Path(__file__).parent / "dex.csv"
@@ -49,7 +56,7 @@ class PokemonScript(Script[ScriptT]):
 	def main(self, e: int) -> tuple[int, Frame]:
 		raise NotImplementedError
 
-	def __init__(self, ser: serial.Serial, cap: Capture, config: dict[str, Any], **kwargs) -> None:
+	def __init__(self, ser: SerialWriter, cap: Capture, config: dict[str, Any], **kwargs) -> None:
 		super().__init__(ser, cap, config, **kwargs)
 
 		self.configPokemon: Final[dict[str, Any]] = config.pop("pokemon")
@@ -82,7 +89,7 @@ class PokemonRunner:
 			cfg: dict[str, Any] = yaml.safe_load(fp)
 
 		self.db: Final[DB] = db
-		self.serial: Final[serial.Serial] = serial.Serial(cfg.pop("serialPort", "COM0"), 9600)
+		self.serial: Final[SerialWriter] = SerialWriter(cfg.pop("serialPort", "COM0"), cfg.pop("baudRate", 9600))
 
 		self.script: PokemonScript = self._setup(scriptClass, cfg, args)
 
@@ -91,8 +98,22 @@ class PokemonRunner:
 		self._scriptStart = datetime.now()
 
 	def _setup(self, scriptClass: Type[PokemonScript], config: dict[str, Any], args: dict[str, Any]) -> PokemonScript:
-		log(logging.INFO, "setting up cv2. This may take a while...")
-		cap = Capture(camID=config.pop("cameraID", 0), width=768, height=480, fps=30)
+		source: Optional[FrameSource] = None
+		if (broker := config.pop("broker", None)) is not None:
+			log(logging.INFO, f"attaching to capture broker '{broker}'")
+			source = BrokerSource(broker)
+		else:
+			log(logging.INFO, "setting up cv2. This may take a while...")
+
+		cap = Capture(
+			source=source,
+			camID=config.pop("cameraID", 0),
+			width=768,
+			height=480,
+			fps=30,
+			clipSeconds=config.pop("clipSeconds", 0),
+			lowLatency=config.pop("lowLatency", False),
+		)
 
 		return scriptClass(self.serial, cap, config, **args, windowName="Pokermans")
 
@@ -113,6 +134,12 @@ class PokemonRunner:
 	def target(self) -> str:
 		return self.script.target
 
+	@final
+	@property
+	def clock(self) -> Clock:
+		"""the script runs on and the runs are timed with"""
+		return self.script.clock
+
 	@property
 	@abstractmethod
 	def totalTime(self) -> int:
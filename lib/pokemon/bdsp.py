@@ -1,16 +1,18 @@
 import difflib
+import pathlib
 import sys
-import time
 from abc import abstractmethod
+from datetime import datetime
 from itertools import cycle
 from typing import Any
+from typing import Callable
+from typing import ClassVar
 from typing import Final
 from typing import final
 from typing import Optional
 
 import cv2
 import pytesseract
-import serial
 
 from . import ExecShiny
 from . import LOG_DELAY
@@ -22,8 +24,14 @@ from lib import ExecCrash
 from lib import ExecLock
 from lib import Frame
 from lib import LOADING_SCREEN_POS
+from lib import Macro
+from lib import MotionDetector
 from lib import Pos
+from lib import Rect
+from lib import ScreenSignature
 from lib import ScriptT
+from lib import SerialWriter
+from lib import Step
 
 
 ENCOUNTER_DIALOG_POS_1: Final[Pos] = Pos(55, 400)
@@ -34,13 +42,69 @@ ROAMER_MAP_POS: Final[Pos] = Pos(340, 280)
 SHORT_DIALOG_POS_1: Final[Pos] = Pos(154, 400)
 SHORT_DIALOG_POS_2: Final[Pos] = Pos(560, 455)
 
+# where the opponent stands (and sparkles) after the battle intro
+ENCOUNTER_SPARKLE_ROI: Final[Rect] = Rect(420, 40, 300, 280)
+# where the own pokemon stands (and sparkles) once it is sent out, above the dialog box
+OWN_SPARKLE_ROI: Final[Rect] = Rect(40, 160, 320, 220)
+
+ENCOUNTER_DIALOG_COLORS: Final[tuple[tuple[Pos, Color], ...]] = (
+	(ENCOUNTER_DIALOG_POS_1, Color.White()),
+	(ENCOUNTER_DIALOG_POS_2, Color.White()),
+)
+
+ENCOUNTER_DIALOG: Final[ScreenSignature] = ScreenSignature(ENCOUNTER_DIALOG_COLORS, name="encounter dialog")
+LOADING_SCREEN: Final[ScreenSignature] = ScreenSignature(((LOADING_SCREEN_POS, Color.Black()),), name="loading screen")
+STARTUP_CRASH: Final[ScreenSignature] = ScreenSignature(((LOADING_SCREEN_POS, Color(41, 41, 41)),), name="startup crash")
+ENCOUNTER_FLASH: Final[ScreenSignature] = ScreenSignature(((LOADING_SCREEN_POS, Color.White()),), name="encounter flash")
+REPEL_DIALOG: Final[ScreenSignature] = ScreenSignature(((SHORT_DIALOG_POS_2, Color.White()),), name="repel used up dialog")
+
+# "The software was closed because an error occurred." screen
+_CRASH_SCREEN_BLACK: Final[ScreenSignature] = ScreenSignature(
+	tuple((Pos(x, y), Color.Black()) for x, y in ((420, 69), (150, 100), (555, 111), (111, 333))),
+)
+_CRASH_SCREEN_WHITE: Final[ScreenSignature] = ScreenSignature(
+	tuple((Pos(x, y), Color.White()) for x, y in ((360, 90), (360, 100), (370, 60), (376, 80), (376, 99))),
+	tolerance=75,
+	quorum=2,
+)
+
+
+# from the roamer's spot into the bag's item pocket
+_OPEN_BAG: Final[Macro] = Macro(
+	(
+		Step(Button.L_UP, 0.3, 0.175),
+		Step(Button.BUTTON_X, gap=0.575),
+		Step(Button.L_UP, gap=0.175),
+		Step(Button.L_RIGHT, gap=0.175),
+		Step(Button.L_RIGHT, gap=0.175),
+		Step(Button.BUTTON_A, gap=1.575),
+	),
+	name="open bag",
+)
+
+
+def isCrashScreen(frame: Frame) -> bool:
+	return _CRASH_SCREEN_BLACK(frame) and _CRASH_SCREEN_WHITE(frame)
+
+
+# frame checks used while running the scripts (e.g. to benchmark them on recorded footage)
+DETECTORS: Final[dict[str, Callable[[Frame], bool]]] = {
+	"encounterDialog": ENCOUNTER_DIALOG,
+	"loadingScreen": LOADING_SCREEN,
+	"startupCrash": STARTUP_CRASH,
+	"crashScreen": isCrashScreen,
+}
+
 
 class BDSPScript(PokemonScript[ScriptT]):
+	# where the sparkle detector looks, scripts hunting their own pokemon (e.g. a starter) look at `OWN_SPARKLE_ROI`
+	sparkleRoi: ClassVar[Rect] = ENCOUNTER_SPARKLE_ROI
+
 	@abstractmethod
 	def main(self, e: int) -> tuple[int, Frame]:
 		raise NotImplementedError
 
-	def __init__(self, ser: serial.Serial, cap: Capture, config: dict[str, Any], **kwargs) -> None:
+	def __init__(self, ser: SerialWriter, cap: Capture, config: dict[str, Any], **kwargs) -> None:
 		super().__init__(ser, cap, config, **kwargs)
 
 		self.configBDSP: Final[dict[str, Any]] = self.configPokemon.pop("bdsp")
@@ -49,8 +113,16 @@ class BDSPScript(PokemonScript[ScriptT]):
 		self.showLastRunDuration: Final[bool] = self.configBDSP.pop("showLastRunDuration", False)
 		self.showBnp: Final[bool] = self.configBDSP.pop("showBnp", False)
 
+		self._sparkles = MotionDetector(self.sparkleRoi, threshold=self.configBDSP.pop("sparkleThreshold", 0.5))
+
 		self._lastDelay: float = 0.0
 		self._maxDelay: float = 0.0
+		self._lastSparkle: float = 0.0
+		self._maxSparkle: float = 0.0
+
+		# recording of the last encounter, replaced by the one of the next encounter unless it was kept
+		self._encounterRecording: Optional[str] = None
+		self._encounterRecordings = 0
 
 	@property
 	@abstractmethod
@@ -58,44 +130,70 @@ class BDSPScript(PokemonScript[ScriptT]):
 		raise NotImplementedError
 
 	def checkShinyDialog(self, e: int, delay: float = 2) -> Frame:
-		self._cap.startCapture("encounter")
+		self.recordEncounter()
 
 		print("waiting for dialog")
 		self.logDebug("waiting for dialog")
-		self.awaitColors((
-			(ENCOUNTER_DIALOG_POS_1, Color.White()),
-			(ENCOUNTER_DIALOG_POS_2, Color.White()),
-		))
+		self.awaitSignature(ENCOUNTER_DIALOG)
 		print(f"dialog start{' ' * 30}\r", end="")
 
-		self.awaitNotColors((
-			(ENCOUNTER_DIALOG_POS_1, Color.White()),
-			(ENCOUNTER_DIALOG_POS_2, Color.White()),
-		))
+		self.awaitNotSignature(ENCOUNTER_DIALOG.withQuorum(1))
 		print(f"dialog end{' ' * 30}\r", end="")
-		t0 = time.time()
+		t0 = self.clock.time()
 
-		encounterFrame = self.getframe()
-		self.awaitColors((
-			(ENCOUNTER_DIALOG_POS_1, Color.White()),
-			(ENCOUNTER_DIALOG_POS_2, Color.White()),
-		))
+		encounterFrame = self.getframe().copy()
+		with self.measureMotion(self._sparkles):
+			self.awaitSignature(ENCOUNTER_DIALOG)
 
-		self._lastDelay = diff = round(time.time() - t0, 3)
+		self._lastDelay = diff = round(self.clock.time() - t0, 3)
 		self._maxDelay = max(self._maxDelay, diff)
+		sparkle = self.recordSparkle()
 
-		self.log(LOG_DELAY, f"dialog delay: {diff:>.03f}s")
+		self.log(LOG_DELAY, f"dialog delay: {diff:>.03f}s | sparkle energy: {sparkle:.2f}")
 		print(f"dialog delay: {diff}s")
 
 		self.waitAndRender(0.5)
 
 		if delay + 10 > diff > delay:
-			raise ExecShiny(e + 1, encounterFrame)
+			raise ExecShiny(e + 1, encounterFrame, features={"sparkle energy": sparkle})
 		elif diff >= 89:
 			raise ExecLock("checking shiny dialog timed out")
 		else:
+			if sparkle > self._sparkles.threshold:
+				self.logDebug(f"sparkle-like motion ({sparkle:.2f}) without a shiny delay")
 			return encounterFrame
 
+	@final
+	def recordEncounter(self) -> None:
+		"""record the encounter to a timestamped file in logs/encounters, replacing the one of the last encounter"""
+		self._cap.stopCapture()
+		if (last := self._encounterRecording) is not None:
+			pathlib.Path(last).unlink(missing_ok=True)
+
+		# numbered too, several encounters may start within a second (e.g. simulated ones)
+		self._encounterRecordings += 1
+		path = f"logs/encounters/encounter-{datetime.now():%Y%m%d-%H%M%S}-{self._encounterRecordings}"
+		self._cap.startCapture(path)
+		self._encounterRecording = f"{path}.avi"
+
+	@final
+	def keepEncounterRecording(self) -> Optional[str]:
+		"""
+		stop recording the encounter and keep the file (e.g. of a shiny)
+
+		@return its path, if one was recorded
+		"""
+		self._cap.stopCapture()
+		path, self._encounterRecording = self._encounterRecording, None
+		return path
+
+	@final
+	def recordSparkle(self) -> float:
+		"""@return peak motion energy measured by the sparkle detector during the last encounter"""
+		self._lastSparkle = sparkle = self._sparkles.peak
+		self._maxSparkle = max(self._maxSparkle, sparkle)
+		return sparkle
+
 	def awaitInGame(self) -> None:
 		self.awaitColor(LOADING_SCREEN_POS, Color.Black())
 		self.logDebug("startup screen")
@@ -105,7 +203,7 @@ class BDSPScript(PokemonScript[ScriptT]):
 
 		self.waitAndRender(1)
 
-		if self.getframe().colorAt(LOADING_SCREEN_POS) == Color(41, 41, 41):
+		if STARTUP_CRASH(self.getframe()):
 			raise ExecCrash
 
 		self.press(Button.BUTTON_A)
@@ -166,22 +264,8 @@ class BDSPScript(PokemonScript[ScriptT]):
 
 			if encounter is True:
 				self.logDebug(f"roamer found after reloading area {areaReloads} times")
-				self.press(Button.L_UP, 0.3)
-				self.waitAndRender(0.1)
-
 				self.logDebug("open backpack")
-				self.press(Button.BUTTON_X)
-				self.waitAndRender(0.5)
-
-				self.press(Button.L_UP)
-				self.waitAndRender(0.1)
-				self.press(Button.L_RIGHT)
-				self.waitAndRender(0.1)
-				self.press(Button.L_RIGHT)
-				self.waitAndRender(0.1)
-
-				self.press(Button.BUTTON_A)
-				self.waitAndRender(1.5)
+				self.runMacro(_OPEN_BAG)
 
 				self.pressN(Button.L_RIGHT, 4, 0.1, render=True)
 
@@ -193,14 +277,16 @@ class BDSPScript(PokemonScript[ScriptT]):
 
 				_directions = cycle(("a", "d"))
 				self.logDebug("go for encounter")
-				tEnd = time.time() + 2
+				tTurn = self.clock.time() + 2
 
-				while (frame := self.getframe()).colorAt(LOADING_SCREEN_POS) != Color.White():
-					if time.time() > tEnd:
+				while True:
+					fired = self.awaitAny({"encounter": ENCOUNTER_FLASH, "repel": REPEL_DIALOG}, max(tTurn - self.clock.time(), 0))
+					if fired is None:
 						self._ser.write(next(_directions).encode())
-						tEnd = time.time() + 0.5
-
-					if frame.colorAt(SHORT_DIALOG_POS_2) == Color.White():
+						tTurn = self.clock.time() + 0.5
+					elif fired[0] == "encounter":
+						break
+					else:
 						self._ser.write(b"0")
 						self.logDebug("re-apply repel")
 						# repel used up
@@ -0,0 +1,146 @@
+import random
+from typing import Any
+from typing import Final
+from typing import final
+from typing import NamedTuple
+from typing import Optional
+
+import numpy
+
+from .bdsp import ENCOUNTER_SPARKLE_ROI
+from .bdsp import OWN_SPARKLE_ROI
+from lib import Button
+from lib import Color
+from lib import Rect
+from lib import Simulation
+from lib import SimulationScreen
+from lib import SimulationState
+
+
+@final
+class SimEncounter(NamedTuple):
+	"""how a static encounter plays out in `BDSPSimulation`"""
+
+	# buttons leading from the overworld through the dialogs into the encounter
+	trigger: tuple[Button, ...] = (Button.BUTTON_A,)
+	# seconds from the last of them to the first flash (e.g. the cry)
+	cry: float = 0.0
+	flashes: int = 1
+	# seconds between two flashes
+	flashGap: float = 4.0
+	# seconds from the last flash to the encounter dialog
+	intro: float = 8.0
+	# where a shiny sparkles
+	sparkleRoi: Rect = ENCOUNTER_SPARKLE_ROI
+
+
+# timed to fit the waits of the scripts of the same name
+SIM_ENCOUNTERS: Final[dict[str, SimEncounter]] = {
+	"arceus": SimEncounter((Button.L_UP, Button.BUTTON_A)),
+	"darkrai": SimEncounter((Button.BUTTON_A,) * 3, cry=1),
+	"giratina": SimEncounter((Button.BUTTON_A,) * 2, cry=2.5),
+	"heatran": SimEncounter((Button.BUTTON_A,) * 3, cry=3.5),
+	"legendary": SimEncounter((Button.L_UP,), cry=5, flashes=2),
+	"pixie": SimEncounter((Button.BUTTON_A,) * 2, cry=3),
+	"ramanas": SimEncounter((Button.BUTTON_A,) * 2, cry=3.5),
+	"regigigas": SimEncounter(cry=1, flashes=2),
+	# through the intro and the bag (picking any starter), the battle starts with the encounter dialog
+	"starter": SimEncounter(
+		(Button.L_UP, *(Button.BUTTON_A,) * 25, Button.BUTTON_B, Button.BUTTON_A, Button.L_UP, Button.BUTTON_A),
+		cry=1,
+		flashes=3,
+		flashGap=6,
+		intro=0,
+		sparkleRoi=OWN_SPARKLE_ROI,
+	),
+}
+
+_SIM_HOME: Final[Color] = Color(120, 120, 120)
+_SIM_TITLE: Final[Color] = Color(40, 70, 150)
+_SIM_OVERWORLD: Final[Color] = Color(70, 130, 80)
+_SIM_BATTLE: Final[Color] = Color(150, 175, 200)
+_SIM_OPPONENT: Final[tuple[Rect, Color]] = (Rect(520, 100, 120, 160), Color(90, 60, 140))
+# covers the SHORT_DIALOG_POS_* and ENCOUNTER_DIALOG_POS_* (and OWN_POKEMON_POS) respectively
+_SIM_DIALOG: Final[tuple[Rect, Color]] = (Rect(140, 390, 440, 75), Color.White())
+_SIM_ENCOUNTER_DIALOG: Final[tuple[Rect, Color]] = (Rect(0, 385, 700, 70), Color.White())
+# sparkles drawn per frame while a shiny is sent out
+_SIM_SPARKLES = 12
+_SIM_SPARKLE_SIZE = 8
+
+
+@final
+class BDSPSimulation(Simulation):
+	def __init__(self, encounter: SimEncounter, *, shinyRate: float = 1 / 4096, sendOut: float = 0.6, shinyDelay: float = 2.0, seed: Optional[int] = None) -> None:
+		"""
+		soft reset, title screen and a static encounter, for `SimulatorSource`
+
+		shinies sparkle in the `SimEncounter.sparkleRoi` and delay the dialog after the encounter dialog
+
+		@param shinyRate chance of an encounter to be shiny
+		@param sendOut seconds between the encounter dialog and the next one of a regular encounter
+		@param shinyDelay seconds a shiny adds to `sendOut`
+		@param seed of the shiny rolls, for reproducible runs
+		"""
+
+		self._shinyRng = random.Random(seed)
+		self._sparkleRng = random.Random(seed)
+		self._shinyRate = shinyRate
+		self._sendOut = sendOut
+		self._shinyDelay = shinyDelay
+		self._sparkleRoi = encounter.sparkleRoi
+
+		self.encounters = 0
+		# encounters (counted from 1) that were shiny
+		self.shinies: list[int] = []
+		self._shiny = False
+
+		black = SimulationScreen(Color.Black())
+		overworld = SimulationScreen(_SIM_OVERWORLD)
+		dialog = SimulationScreen(_SIM_OVERWORLD, (_SIM_DIALOG,))
+		battle = SimulationScreen(_SIM_BATTLE, (_SIM_OPPONENT,))
+		battleDialog = SimulationScreen(_SIM_BATTLE, (_SIM_OPPONENT, _SIM_ENCOUNTER_DIALOG))
+
+		states: dict[str, SimulationState] = {
+			"home": SimulationState(SimulationScreen(_SIM_HOME), ((Button.BUTTON_X, "close game"),)),
+			"close game": SimulationState(SimulationScreen(_SIM_HOME, (_SIM_DIALOG,)), ((Button.BUTTON_A, "boot"),)),
+			"boot": SimulationState(black, timeout=(3, "title")),
+			"title": SimulationState(SimulationScreen(_SIM_TITLE), ((Button.BUTTON_A, "loading"),)),
+			"loading": SimulationState(black, timeout=(4, "overworld")),
+		}
+
+		steps = ["overworld"] + [f"dialog {i}" for i in range(1, len(encounter.trigger))] + ["cry"]
+		for i, button in enumerate(encounter.trigger):
+			states[steps[i]] = SimulationState(overworld if i == 0 else dialog, ((button, steps[i + 1]),))
+		states["cry"] = SimulationState(overworld, timeout=(encounter.cry, "flash 1"))
+
+		for i in range(1, encounter.flashes):
+			states[f"flash {i}"] = SimulationState(SimulationScreen(Color.White()), timeout=(0.3, f"after flash {i}"))
+			states[f"after flash {i}"] = SimulationState(battle, timeout=(encounter.flashGap, f"flash {i + 1}"))
+		states[f"flash {encounter.flashes}"] = SimulationState(SimulationScreen(Color.White()), timeout=(0.3, "intro"))
+
+		states["intro"] = SimulationState(battle, timeout=(encounter.intro, "encounter dialog"))
+		states["encounter dialog"] = SimulationState(battleDialog, timeout=(3, "send out"))
+		states["send out"] = SimulationState(SimulationScreen(_SIM_BATTLE, (_SIM_OPPONENT,), self._sparkle), timeout=(self._rollShiny, "battle"))
+		states["battle"] = SimulationState(battleDialog)
+
+		super().__init__(states, "overworld", anywhere=((Button.BUTTON_HOME, "home"),))
+
+	def _rollShiny(self) -> float:
+		self.encounters += 1
+		self._shiny = self._shinyRng.random() < self._shinyRate
+		if self._shiny is True:
+			self.shinies.append(self.encounters)
+		return self._sendOut + (self._shinyDelay if self._shiny else 0)
+
+	def _sparkle(self, out: numpy.ndarray, t: float) -> None:
+		if self._shiny is False:
+			return
+
+		x, y, w, h = self._sparkleRoi
+		for _ in range(_SIM_SPARKLES):
+			sx = x + self._sparkleRng.randrange(w - _SIM_SPARKLE_SIZE)
+			sy = y + self._sparkleRng.randrange(h - _SIM_SPARKLE_SIZE)
+			out[sy:sy + _SIM_SPARKLE_SIZE, sx:sx + _SIM_SPARKLE_SIZE] = 255
+
+	def stats(self) -> tuple[tuple[str, Any], ...]:
+		return super().stats() + (("Simulated encounters (shiny)", f"{self.encounters} ({len(self.shinies)})"),)
@@ -1,12 +1,11 @@
 from abc import abstractmethod
 from typing import Any
 
-import serial
-
 from . import PokemonScript
 from lib import Capture
 from lib import Frame
 from lib import ScriptT
+from lib import SerialWriter
 
 
 class SVScript(PokemonScript[ScriptT]):
@@ -14,7 +13,7 @@ class SVScript(PokemonScript[ScriptT]):
 	def main(self, e: int) -> tuple[int, Frame]:
 		raise NotImplementedError
 
-	def __init__(self, ser: serial.Serial, cap: Capture, config: dict[str, Any], **kwargs) -> None:
+	def __init__(self, ser: SerialWriter, cap: Capture, config: dict[str, Any], **kwargs) -> None:
 		super().__init__(ser, cap, config, **kwargs)
 
 	@property
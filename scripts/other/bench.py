@@ -0,0 +1,60 @@
+import argparse
+import logging
+import time
+from typing import Any
+
+import numpy
+
+from lib import Frame
+from lib import log
+from lib import ReplaySource
+from lib.pokemon.bdsp import DETECTORS
+
+
+Parser = argparse.ArgumentParser(add_help=False)
+Parser.add_argument("path", type=str, help="video file or directory of images to replay")
+Parser.add_argument("--limit", type=int, default=None, dest="limit", help="stop after this many frames")
+
+
+def run(args: dict[str, Any]) -> int:
+	source = ReplaySource(args.pop("path"), paced=False)
+
+	out = numpy.zeros((480, 768, 3), dtype=numpy.uint8)
+	limit: int = args.pop("limit") or -1
+
+	timings = dict.fromkeys(DETECTORS, 0.0)
+	hits = dict.fromkeys(DETECTORS, 0)
+
+	nFrames = 0
+	tDecode = 0.0
+
+	log(logging.INFO, f"benchmarking {len(DETECTORS)} detectors")
+	try:
+		while nFrames != limit:
+			t0 = time.perf_counter()
+			ok, out = source.read(out)
+			tDecode += time.perf_counter() - t0
+
+			if ok is False:
+				break
+
+			nFrames += 1
+			frame = Frame(out, nFrames)
+
+			for name, detector in DETECTORS.items():
+				t0 = time.perf_counter()
+				hit = detector(frame)
+				timings[name] += time.perf_counter() - t0
+				hits[name] += hit
+	finally:
+		source.release()
+
+	if nFrames == 0:
+		log(logging.ERROR, "no frames could be read")
+		return 1
+
+	print(f"{'decode':<20} {nFrames / tDecode:>12.1f} fps")
+	for name, t in timings.items():
+		print(f"{name:<20} {nFrames / (t or 1e-9):>12.1f} fps | {hits[name]:>6} / {nFrames} frames matched")
+
+	return 0
@@ -0,0 +1,46 @@
+import argparse
+import logging
+import time
+from typing import Any
+
+import yaml
+
+from lib import Broker
+from lib import CameraSource
+from lib import log
+
+
+Parser = argparse.ArgumentParser(add_help=False)
+Parser.add_argument("--name", type=str, default=None, dest="name", help="name of the shared memory block (default: 'broker' from config, or switchCapture)")
+Parser.add_argument("--slots", type=int, default=4, dest="slots", help="amount of frames kept in shared memory")
+Parser.add_argument("--fps", type=int, default=30, dest="fps", help="fps of the capture")
+Parser.add_argument("--width", type=int, default=768, dest="width", help="width of the capture")
+Parser.add_argument("--height", type=int, default=480, dest="height", help="height of the capture")
+
+
+def run(args: dict[str, Any]) -> int:
+	with open(args.pop("configFile"), "r") as fp:
+		cfg: dict[str, Any] = yaml.safe_load(fp)
+
+	name: str = args.pop("name") or cfg.pop("broker", None) or "switchCapture"
+	width: int = args.pop("width")
+	height: int = args.pop("height")
+
+	log(logging.INFO, "setting up cv2. This may take a while...")
+	source = CameraSource(cfg.pop("cameraID", 0), width, height, args.pop("fps"), lowLatency=cfg.pop("lowLatency", False))
+	broker = Broker(name, source, width, height, slots=args.pop("slots"))
+
+	log(logging.INFO, f"publishing frames as '{name}'; set 'broker: {name}' in the config to use them. Press Ctrl+C to stop")
+	tLog = time.monotonic() + 10
+	try:
+		while True:
+			broker.publishNext()
+			if (t := time.monotonic()) > tLog:
+				log(logging.DEBUG, f"broker: {broker.published} frames published, {broker.failures} failed")
+				tLog = t + 10
+	except KeyboardInterrupt:
+		pass
+	finally:
+		broker.close()
+
+	return 0
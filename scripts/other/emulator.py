@@ -0,0 +1,143 @@
+import argparse
+import logging
+import time
+from typing import Any
+from typing import Callable
+
+import numpy
+
+from lib import Button
+from lib import Capture
+from lib import Emulator
+from lib import FrameSource
+from lib import log
+from lib import Macro
+from lib import Script
+from lib import SerialWriter
+from lib import Step
+
+
+Parser = argparse.ArgumentParser(add_help=False)
+Parser.add_argument("--bench", action="store_true", dest="bench", help="benchmark the input timing against the emulator instead of serving it")
+Parser.add_argument("-n", type=int, default=50, dest="n", help="amount of presses per benchmark")
+Parser.add_argument("--baud", type=int, default=9600, dest="baudRate", help="baud rate used for the benchmark")
+
+
+class _BlankSource(FrameSource):
+	def read(self, out: numpy.ndarray) -> tuple[bool, numpy.ndarray]:
+		time.sleep(1 / 30)
+		return True, out
+
+	def release(self) -> None:
+		pass
+
+	@property
+	def fps(self) -> float:
+		return 30.0
+
+
+class _BenchScript(Script[int]):
+	def __init__(self, *args, **kwargs) -> None:
+		super().__init__(*args, **kwargs)
+
+		self._emulator: Emulator = kwargs.pop("emulator")
+		self._n: int = kwargs.pop("n")
+
+	def main(self, e: int) -> int:
+		"""@return 0, or 1 if the emulator didn't receive what was sent"""
+		n = self._n
+		press = Button.BUTTON_A.encode()[0]
+
+		# name, what to run, bytes it sends, intended time between presses
+		cases: tuple[tuple[str, Callable[[], None], int, float], ...] = (
+			("press", self._pressEach, 2 * n, 0.125),
+			("pressN", lambda: self.pressN(Button.BUTTON_A, n, 0.05), 2 * n, 0.175),
+			("macro", lambda: self.runMacro(Macro((Step(Button.BUTTON_A, gap=0.125),) * n)), 2 * n, 0.175),
+			("flood", self._flood, 10 * n, 0.0),
+		)
+
+		print(f"{'':<8} {'throughput':>14} {'latency (avg/max)':>22} {'press drift (avg/max)':>24}")
+		for name, fn, nBytes, period in cases:
+			received = self._emulator.received
+			dropped = self._ser.dropped
+			t0 = time.perf_counter_ns()
+			fn()
+
+			# the flood outruns the queue, what it drops never arrives
+			nBytes -= self._ser.dropped - dropped
+			tEnd = time.monotonic() + 10
+			while self._emulator.received < received + nBytes and time.monotonic() < tEnd:
+				time.sleep(0.001)
+			t1 = time.perf_counter_ns()
+
+			sent = self._ser.history(t0)
+			events = self._emulator.events(t0)
+			if len(sent) != len(events):
+				self.log(logging.ERROR, f"{name}: sent {len(sent)} bytes, but the emulator received {len(events)}")
+				return 1
+
+			latencies = numpy.array([e.timestamp - c.queued for c, e in zip(sent, events)]) / 1e6
+			throughput = len(events) / ((t1 - t0) / 1e9)
+			drift = "-"
+			if period > 0:
+				# deviation of every press from where it should be, relative to the first one
+				presses = numpy.array([e.timestamp for e in events if e.data == press], dtype=numpy.int64)
+				deviation = numpy.abs(presses - presses[0] - numpy.arange(len(presses)) * round(period * 1e9)) / 1e6
+				drift = f"{deviation.mean():.2f}ms | {deviation.max():.2f}ms"
+
+			print(f"{name:<8} {throughput:>10.1f} B/s {f'{latencies.mean():.2f}ms | {latencies.max():.2f}ms':>22} {drift:>24}")
+
+		return 0
+
+	def _pressEach(self) -> None:
+		for _ in range(self._n):
+			self.press(Button.BUTTON_A)
+
+	def _flood(self) -> None:
+		"""write faster than the baud rate drains the queue"""
+		for _ in range(10 * self._n):
+			self._ser.write(b"A")
+
+
+def _serve() -> int:
+	emulator = Emulator()
+	log(logging.INFO, f"emulating the microcontroller on {emulator.port}; set 'serialPort: {emulator.port}' in the config. Press Ctrl+C to stop")
+
+	try:
+		while True:
+			time.sleep(10)
+			log(logging.DEBUG, ", ".join(f"{k}: {v}" for k, v in emulator.stats()))
+	except KeyboardInterrupt:
+		pass
+	finally:
+		emulator.close()
+
+	for k, v in emulator.stats():
+		print(f"{k}: {v}")
+	return 0
+
+
+def _bench(n: int, baudRate: int) -> int:
+	emulator = Emulator()
+	ser = SerialWriter(emulator.port, baudRate)
+	script = _BenchScript(ser, Capture(source=_BlankSource()), {"renderCapture": False}, emulator=emulator, n=n)
+
+	try:
+		if (ret := script(0)) != 0:
+			return ret
+
+		print()
+		for k, v in script.extraStats + emulator.stats():
+			print(f"{k}: {v}")
+	finally:
+		ser.close()
+		emulator.close()
+
+	return 0
+
+
+def run(args: dict[str, Any]) -> int:
+	if args.pop("bench") is True:
+		return _bench(args.pop("n"), args.pop("baudRate"))
+	else:
+		return _serve()
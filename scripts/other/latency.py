@@ -0,0 +1,65 @@
+import argparse
+import logging
+import statistics
+from typing import Any
+
+import yaml
+
+from lib import Button
+from lib import Capture
+from lib import LOADING_SCREEN_POS
+from lib import log
+from lib import Pos
+from lib import Script
+from lib import SerialWriter
+
+
+Parser = argparse.ArgumentParser(add_help=False)
+Parser.add_argument("--button", type=str, default=Button.BUTTON_HOME.name, choices=tuple(b.name for b in Button), dest="button", help="button that changes the screen at the probed position (default: %(default)s)")
+Parser.add_argument("--x", type=int, default=LOADING_SCREEN_POS.x, dest="x", help="x of the probed position")
+Parser.add_argument("--y", type=int, default=LOADING_SCREEN_POS.y, dest="y", help="y of the probed position")
+Parser.add_argument("-n", type=int, default=10, dest="n", help="amount of measurements")
+Parser.add_argument("--low-latency", action="store_true", dest="lowLatency", help="use the low latency capture mode")
+
+
+class _LatencyScript(Script[list[float]]):
+	def __init__(self, *args, **kwargs) -> None:
+		super().__init__(*args, **kwargs)
+
+		self._button: Button = kwargs.pop("button")
+		self._pos: Pos = kwargs.pop("pos")
+		self._n: int = kwargs.pop("n")
+
+	def main(self, e: int) -> list[float]:
+		"""@return latencies (in seconds) of the presses that changed the screen"""
+		latencies: list[float] = []
+		for _ in range(self._n):
+			if (latency := self.measureLatency(self._button, self._pos)) is None:
+				self.log(logging.WARNING, f"no change at {self._pos} after pressing {self._button.name}")
+			else:
+				latencies.append(latency)
+				print(f"latency: {latency * 1000:.1f}ms")
+			self.waitAndRender(2)
+
+		return latencies
+
+
+def run(args: dict[str, Any]) -> int:
+	with open(args.pop("configFile"), "r") as fp:
+		cfg: dict[str, Any] = yaml.safe_load(fp)
+
+	log(logging.INFO, "setting up cv2. This may take a while...")
+	cap = Capture(camID=cfg.pop("cameraID", 0), lowLatency=args.pop("lowLatency"))
+	script = _LatencyScript(
+		SerialWriter(cfg.pop("serialPort", "COM0"), cfg.pop("baudRate", 9600)), cap, cfg,
+		windowName="Latency", button=Button[args.pop("button")], pos=Pos(args.pop("x"), args.pop("y")), n=args.pop("n"),
+	)
+
+	if len(latencies := script(0)) == 0:
+		return 1
+
+	print(f"min/avg/max: {min(latencies) * 1000:.1f}ms / {statistics.mean(latencies) * 1000:.1f}ms / {max(latencies) * 1000:.1f}ms")
+	for info, stat in cap.stats():
+		print(f"{info}: {stat}")
+
+	return 0
@@ -0,0 +1,140 @@
+import argparse
+import contextlib
+import logging
+import os
+import select
+import sys
+from collections.abc import Generator
+from typing import Any
+from typing import Optional
+
+import numpy
+import yaml
+
+from lib import Button
+from lib import Capture
+from lib import ExecStop
+from lib import InputRecorder
+from lib import InputRecording
+from lib import log
+from lib import Macro
+from lib import Script
+from lib import SerialWriter
+
+
+Parser = argparse.ArgumentParser(add_help=False)
+Parser.add_argument("path", type=str, help="file to record to (or to replay with --replay)")
+Parser.add_argument("--replay", action="store_true", dest="replay", help="replay the recording at `path` and compare the timing to it, instead of recording")
+Parser.add_argument("--hold", type=float, default=0.05, dest="hold", help="seconds a button is held per key press (default: %(default)s)")
+
+# the key of a button is the byte the controller gets for it (e.g. 'A', 'w' for up, 'H' for HOME)
+_KEYS: dict[str, Button] = {b.value: b for b in Button if b is not Button.EMPTY}
+
+
+@contextlib.contextmanager
+def _terminal() -> Generator[None, None, None]:
+	"""hand every key to `_readKey` as soon as it is typed"""
+	if os.name != "posix":
+		yield
+		return
+
+	import termios
+	import tty
+
+	attrs = termios.tcgetattr(sys.stdin)
+	tty.setcbreak(sys.stdin)
+	try: yield
+	finally: termios.tcsetattr(sys.stdin, termios.TCSADRAIN, attrs)
+
+
+def _readKey() -> Optional[str]:
+	"""@return the next typed key, if any (never blocks)"""
+	if os.name == "nt":
+		import msvcrt
+		return msvcrt.getwch() if msvcrt.kbhit() else None
+	elif select.select((sys.stdin,), (), (), 0)[0]:
+		return sys.stdin.read(1)
+	return None
+
+
+class _RecordScript(Script[InputRecording]):
+	def __init__(self, *args, **kwargs) -> None:
+		super().__init__(*args, **kwargs)
+
+		self._hold: float = kwargs.pop("hold")
+		self._replay: Optional[Macro] = kwargs.pop("replay")
+
+	def main(self, e: int) -> InputRecording:
+		"""
+		press a button for every typed key, or play the macro to replay
+
+		@return what was pressed meanwhile
+		"""
+		recorder = InputRecorder(self._ser, self._cap)
+		try:
+			if self._replay is not None:
+				self.logInfo(f"replaying {self._replay} ({self._replay.duration:.1f}s)")
+				self.runMacro(self._replay)
+			else:
+				self._record()
+		finally:
+			recording = recorder.stop()
+
+		return recording
+
+	def _record(self) -> None:
+		self.logInfo(f"recording; type {', '.join(_KEYS)} to press buttons. Press Ctrl+C (or 'q' in the preview) to stop")
+
+		with _terminal():
+			try:
+				while True:
+					if (key := _readKey()) is None:
+						self.getnextframe()
+					elif (button := _KEYS.get(key)) is not None:
+						self.press(button, self._hold)
+			except (KeyboardInterrupt, ExecStop):
+				pass
+
+
+def _presses(recording: InputRecording) -> numpy.ndarray:
+	"""@return (offset, frame) of every press, relative to the first one"""
+	presses = numpy.array([(offset, frame) for offset, data, frame in recording.inputs if data.decode() in _KEYS], dtype=numpy.int64).reshape(-1, 2)
+	return presses - presses[:1]
+
+
+def _compare(recorded: InputRecording, replayed: InputRecording) -> int:
+	a, b = _presses(recorded), _presses(replayed)
+	print(f"{'Presses (replayed)':<24} {len(a)} ({len(b)})")
+	print(f"{'Duration (replayed)':<24} {recorded.duration:.3f}s ({replayed.duration:.3f}s)")
+	if len(a) != len(b) or len(a) == 0:
+		log(logging.ERROR, "the replay didn't press what was recorded")
+		return 1
+
+	drift = numpy.abs(b[:, 0] - a[:, 0]) / 1e6
+	frames = numpy.abs(b[:, 1] - a[:, 1])
+	print(f"{'Press drift (avg/max)':<24} {drift.mean():.2f}ms | {drift.max():.2f}ms")
+	print(f"{'Frame offset (avg/max)':<24} {frames.mean():.2f} | {frames.max()}")
+	return 0
+
+
+def run(args: dict[str, Any]) -> int:
+	with open(args.pop("configFile"), "r") as fp:
+		cfg: dict[str, Any] = yaml.safe_load(fp)
+
+	path: str = args.pop("path")
+	replay: Optional[InputRecording] = InputRecording.load(path) if args.pop("replay") is True else None
+
+	log(logging.INFO, "setting up cv2. This may take a while...")
+	ser = SerialWriter(cfg.pop("serialPort", "COM0"), cfg.pop("baudRate", 9600))
+	cap = Capture(camID=cfg.pop("cameraID", 0))
+	script = _RecordScript(ser, cap, cfg, windowName="Record", hold=args.pop("hold"), replay=replay.macro(path) if replay is not None else None)
+
+	recording = script(0)
+	if replay is not None:
+		return _compare(replay, recording)
+
+	recording.save(path)
+	log(logging.INFO, f"recorded {len(recording)} inputs ({recording.duration:.1f}s) to {path}")
+	for k, v in script.extraStats:
+		print(f"{k}: {v}")
+	return 0
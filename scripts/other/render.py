@@ -1,36 +1,54 @@
 import argparse
 import logging
 from typing import Any
+from typing import Optional
 
 import cv2
 import yaml
 
+from lib import BrokerSource
 from lib import Capture
+from lib import FrameSource
 from lib import log
+from lib import ReplaySource
 
 
 Parser = argparse.ArgumentParser(add_help=False)
 Parser.add_argument("--fps", type=int, default=30, dest="fps", help="fps of the capture")
 Parser.add_argument("--width", type=int, default=768, dest="width", help="width of the capture")
 Parser.add_argument("--height", type=int, default=480, dest="height", help="height of the capture")
+Parser.add_argument("--replay", type=str, default=None, dest="replay", help="render a video file or directory of images instead of the camera")
+Parser.add_argument("--unpaced", action="store_true", dest="unpaced", help="replay as fast as possible instead of at the recorded fps")
 
 
 def run(args: dict[str, Any]) -> int:
 	with open(args.pop("configFile"), "r") as fp:
 		cfg: dict[str, Any] = yaml.safe_load(fp)
 
-	log(logging.INFO, "setting up cv2. This may take a while...")
+	source: Optional[FrameSource] = None
+	if (replay := args.pop("replay")) is not None:
+		source = ReplaySource(replay, paced=not args.pop("unpaced"))
+	elif (broker := cfg.pop("broker", None)) is not None:
+		log(logging.INFO, f"attaching to capture broker '{broker}'")
+		source = BrokerSource(broker)
+	else:
+		log(logging.INFO, "setting up cv2. This may take a while...")
+
 	cap = Capture(
 		camID=cfg.pop("cameraID", 0),
 		width=args.pop("width"),
 		height=args.pop("height"),
 		fps=args.pop("fps"),
+		source=source,
 	)
 
 	log(logging.INFO, "Press Ctrl+C to stop rendering")
+	frameId = 0
 	try:
 		while True:
-			cv2.imshow("Switch Render", cap._read())
+			frame = cap.readNext(frameId)
+			frameId = frame.id
+			cv2.imshow("Switch Render", frame.ndarray)
 			if cv2.waitKey(1) & 0xFF == ord("q"):
 				break
 	except KeyboardInterrupt:
@@ -0,0 +1,107 @@
+import argparse
+import importlib
+import logging
+import shlex
+import time
+from typing import Any
+
+from lib import Capture
+from lib import Clock
+from lib import Emulator
+from lib import ExecLock
+from lib import log
+from lib import SerialWriter
+from lib import SimulatorSource
+from lib import SYSTEM_CLOCK
+from lib import VirtualClock
+from lib.pokemon import ExecShiny
+from lib.pokemon.bdsp_sim import BDSPSimulation
+from lib.pokemon.bdsp_sim import SIM_ENCOUNTERS
+
+
+Parser = argparse.ArgumentParser(add_help=False)
+Parser.add_argument("script", type=str, choices=sorted(SIM_ENCOUNTERS), help="bdsp script to run against the simulated console")
+Parser.add_argument("-n", type=int, default=10, dest="n", help="amount of encounters to run")
+Parser.add_argument("--shiny-rate", type=float, default=0.2, dest="shinyRate", help="chance of a simulated encounter to be shiny")
+Parser.add_argument("--send-out", type=float, default=0.6, dest="sendOut", help="seconds between the encounter dialog and the next one of a regular encounter (default: %(default)s)")
+Parser.add_argument("--shiny-delay", type=float, default=2.0, dest="shinyDelay", help="seconds a shiny adds to --send-out (default: %(default)s)")
+Parser.add_argument("--seed", type=int, default=None, dest="seed", help="seed of the shiny rolls")
+Parser.add_argument("--realtime", action="store_true", dest="realtime", help="run in real time instead of as fast as possible on a virtual clock")
+Parser.add_argument("--fps", type=float, default=30, dest="fps", help="fps of the simulated capture")
+# an option rather than trailing positionals, argparse would take those as soon as it reads the script
+Parser.add_argument("--script-args", type=str, default="", dest="scriptArgs", help="arguments of the script, quoted (e.g. --script-args Dialga for legendary)")
+
+
+def run(args: dict[str, Any]) -> int:
+	name: str = args.pop("script")
+	n: int = args.pop("n")
+
+	# parsed like the bdsp runner does, so scripts get what they expect (e.g. their target)
+	module = importlib.import_module(f"scripts.pokemon.bdsp.{name}")
+	scriptArgs = vars(module.Parser.parse_args(shlex.split(args.pop("scriptArgs"))))
+
+	# created first, so this thread (the script's) is attached to it
+	clock: Clock = SYSTEM_CLOCK if args.pop("realtime") is True else VirtualClock()
+
+	emulator = Emulator(clock=clock)
+	simulation = BDSPSimulation(SIM_ENCOUNTERS[name], shinyRate=args.pop("shinyRate"), sendOut=args.pop("sendOut"), shinyDelay=args.pop("shinyDelay"), seed=args.pop("seed"))
+	ser = SerialWriter(emulator.port, clock=clock)
+	cap = Capture(source=SimulatorSource(simulation, emulator, fps=args.pop("fps"), clock=clock), clock=clock)
+
+	if isinstance(clock, VirtualClock):
+		# a press takes no virtual time to reach the console
+		clock.holdWhile(lambda: ser.writtenBytes < ser.queuedBytes or emulator.received < ser.queuedBytes)
+
+	config: dict[str, Any] = {"renderCapture": False, "pokemon": {"lang": "en", "bdsp": {}}}
+	script = module.Script(ser, cap, config, **scriptArgs)
+
+	log(logging.INFO, f"running {name} for {n} simulated encounters on {emulator.port}")
+
+	# encounters (counted like `BDSPSimulation.shinies`) the script reported as shiny
+	detected: list[int] = []
+	locks = 0
+
+	e = 0
+	tStart = clock.time()
+	tRealStart = time.monotonic()
+	try:
+		while simulation.encounters < n:
+			try:
+				e, _ = script(e)
+			except ExecShiny as shiny:
+				detected.append(simulation.encounters)
+				script.keepEncounterRecording()
+				e = shiny.encounter
+			except ExecLock as lock:
+				locks += 1
+				log(logging.WARNING, f"script locked up in state '{simulation.state}': {lock.ctx}")
+			finally:
+				cap.stopCapture()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		tElapsed = clock.time() - tStart
+		tReal = time.monotonic() - tRealStart
+
+		# before the clock is let go
+		stats = cap.stats() + script.extraStats + emulator.stats()
+		if isinstance(clock, VirtualClock):
+			stats += clock.stats()
+			clock.stop()
+		ser.close()
+		emulator.close()
+
+	shinies = set(simulation.shinies)
+	hits = shinies.intersection(detected)
+
+	print()
+	print(f"{'Encounters':<24} {simulation.encounters} in {tElapsed:.0f}s ({simulation.encounters / (tElapsed or 1) * 3600:.1f}/h)")
+	print(f"{'Real time':<24} {tReal:.0f}s ({tElapsed / (tReal or 1):.1f}x)")
+	print(f"{'Locks':<24} {locks}")
+	print(f"{'Shinies (detected)':<24} {len(shinies)} ({len(hits)})")
+	print(f"{'False positives':<24} {len(set(detected) - shinies)}")
+	print(f"{'Missed':<24} {sorted(shinies - hits)}")
+	for k, v in stats:
+		print(f"{k:<24} {v}")
+
+	return 0 if len(hits) == len(shinies) == len(detected) else 1
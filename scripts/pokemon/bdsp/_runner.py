@@ -21,11 +21,11 @@ from lib import DB
 from lib import Frame
 from lib import LOADING_SCREEN_POS
 from lib import log
-from lib import Pos
 from lib.pokemon import ExecShiny
 from lib.pokemon import PokemonRunner
 from lib.pokemon import RunnerAction
 from lib.pokemon.bdsp import BDSPScript
+from lib.pokemon.bdsp import isCrashScreen
 
 
 _scripsPath = pathlib.Path(__file__).parent
@@ -84,7 +84,7 @@ class Runner(PokemonRunner):
 		self.crashes = 0
 		self.lastDuration = timedelta(0, 0)
 
-		self.runStart = datetime.now()
+		self.runStart = self.clock.time()
 
 	@property
 	def key(self) -> str:
@@ -102,11 +102,11 @@ class Runner(PokemonRunner):
 		self.script.waitAndRender(5)
 
 	def run(self) -> None:
-		self.runStart = datetime.now()
+		self.runStart = self.clock.time()
 		self.encountersTotal, encFrame = self.script(self.encountersTotal)
 
 	def runPost(self) -> None:
-		self.lastDuration = datetime.now() - self.runStart
+		self.lastDuration = timedelta(seconds=self.clock.time() - self.runStart)
 		self._runs.append(self.lastDuration.total_seconds())
 		self.encountersCurrent += 1
 
@@ -131,20 +131,14 @@ class Runner(PokemonRunner):
 	def onLock(self, lock: lib.ExecLock) -> RunnerAction:
 		self.crashes += 1
 
-		frame = self.script.getframe()
-		if all(
-			frame.colorAt(Pos(x, y)).distance(Color.Black()) == 0
-			for x, y in ((420, 69), (150, 100), (555, 111), (111, 333))
-		) and sum(
-			frame.colorAt(Pos(x, y)).distance(Color.White()) <= 75
-			for x, y in ((360, 90), (360, 100), (370, 60), (376, 80), (376, 99))
-		) >= 2:
+		self.script._cap.dumpClip(f"logs/clips/lock-{datetime.now():%Y%m%d-%H%M%S}")
+
+		if isCrashScreen(self.script.getframe()):
 			self.script.log(logging.WARNING, "Game crashed. Resolving..")
 			self.script.press(Button.BUTTON_A)
 			self.script.waitAndRender(1)
 			self.script.whileNotColor(LOADING_SCREEN_POS, Color.Black(), 0.5, lambda: self.script.press(Button.BUTTON_A))
 			return RunnerAction.Continue
-		del frame
 
 		ctx = f" (context: {lock.ctx})" if lock.ctx is not None else ""
 		msg = f"script locked up{ctx}"
@@ -164,7 +158,9 @@ class Runner(PokemonRunner):
 		return RunnerAction.Continue
 
 	def onShiny(self, shiny: ExecShiny) -> RunnerAction:
-		self.script._cap.stopCapture()
+		if (recording := self.script.keepEncounterRecording()) is not None:
+			self.script.log(logging.INFO, f"kept the recording of the shiny encounter: {recording}")
+		self.script._cap.dumpClip(f"logs/clips/shiny-{datetime.now():%Y%m%d-%H%M%S}")
 
 		_name = self.script.getName()
 		name = ("SHINY " + (_name or "")).strip()
@@ -180,6 +176,7 @@ class Runner(PokemonRunner):
 		]
 		if _name is not None:
 			fields.insert(0, {"name": "Pokemon", "value": _name.strip(), "inline": True})
+		fields.extend({"name": k.capitalize(), "value": f"{v:.2f}", "inline": True} for k, v in shiny.features.items())
 
 		self.script._maxDelay = 0.0
 		with tempfile.TemporaryDirectory() as tempDirPath:
@@ -191,6 +188,8 @@ class Runner(PokemonRunner):
 				"fields": fields,
 			})
 		self.script.logInfo(msg)
+		if len(shiny.features) > 0:
+			self.script.logInfo(", ".join(f"{k}: {v:.2f}" for k, v in shiny.features.items()))
 		self.script.sendMessage(msg)
 		self.script.sendImage(shiny.encounterFrame)
 
@@ -240,7 +239,9 @@ class Runner(PokemonRunner):
 		_max = self.script._maxDelay
 
 		stats.append(("Delays (last/max)", f"{_last:>.03f}s | {_max:>.03f}s"))
+		stats.append(("Sparkle energy (last/max)", f"{self.script._lastSparkle:.2f} | {self.script._maxSparkle:.2f}"))
 
+		stats.extend(self.script._cap.stats())
 		stats.extend(self.script.extraStats)
 
 		return tuple(stats)
@@ -7,6 +7,7 @@ from lib import Color
 from lib import Frame
 from lib import Pos
 from lib import RequirementsAction
+from lib import ScreenSignature
 from lib.pokemon.bdsp import BDSPScript
 from lib.pokemon.bdsp import SHORT_DIALOG_POS_1
 from lib.pokemon.bdsp import SHORT_DIALOG_POS_2
@@ -16,12 +17,16 @@ _Requirements: tuple[str, ...] = ("Stand at the last step before the platform",)
 Parser = argparse.ArgumentParser(add_help=False)
 Parser.add_argument("-r", "--requriements", action=RequirementsAction, help="print out the requirements for a script", requirements=_Requirements)
 
-_DIALOG_POS_COLS: tuple[tuple[Pos, Color], ...] = (
-	(SHORT_DIALOG_POS_1, Color.White()),
-	(SHORT_DIALOG_POS_2, Color.White()),
-	(Pos(260, 450), Color.White()),
-	(Pos(420, 420), Color.White()),
+_DIALOG: ScreenSignature = ScreenSignature(
+	(
+		(SHORT_DIALOG_POS_1, Color.White()),
+		(SHORT_DIALOG_POS_2, Color.White()),
+		(Pos(260, 450), Color.White()),
+		(Pos(420, 420), Color.White()),
+	),
+	name="dialog",
 )
+_DIALOG_NEAR: ScreenSignature = _DIALOG.withTolerance(32)
 
 
 class Script(BDSPScript):
@@ -41,10 +46,9 @@ class Script(BDSPScript):
 		self.logDebug("wait for dialog")
 		try:
 			print("waiting for text box")
-			self.awaitColors(_DIALOG_POS_COLS)
+			self.awaitSignature(_DIALOG)
 		except lib.ExecLock:
-			f = self.getframe()
-			if not all(f.colorAt(p).distance(c) <= 32 for p, c in _DIALOG_POS_COLS):
+			if not _DIALOG_NEAR(self.getframe()):
 				while True:
 					if (do := input("continue here? (y/yes | n/no)").lower()) in ("y", "yes"):
 						break
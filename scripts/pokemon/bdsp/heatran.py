@@ -9,6 +9,7 @@ from lib import LOADING_SCREEN_POS
 from lib import RequirementsAction
 from lib.pokemon.bdsp import BDSPScript
 from lib.pokemon.bdsp import SHORT_DIALOG_POS_2
+from lib.pokemon.bdsp import STARTUP_CRASH
 
 
 _Requirements: tuple[str, ...] = ("Stand in front of Heatran",)
@@ -33,7 +34,7 @@ class Script(BDSPScript):
 
 		self.waitAndRender(1)
 
-		if self.getframe().colorAt(LOADING_SCREEN_POS) == Color(41, 41, 41):
+		if STARTUP_CRASH(self.getframe()):
 			raise ExecCrash
 
 		self.press(Button.BUTTON_A)
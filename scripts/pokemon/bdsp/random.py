@@ -1,5 +1,4 @@
 import argparse
-import time
 from itertools import cycle
 
 from lib import Button
@@ -45,12 +44,12 @@ class Script(BDSPScript):
 		return "Random"
 
 	def main(self, e: int) -> tuple[int, Frame]:
-		tEnd = time.time()
+		tEnd = self.clock.time()
 
-		while self.getframe().colorAt(LOADING_SCREEN_POS) != Color.White():
-			if time.time() > tEnd:
+		while self.getnextframe().colorAt(LOADING_SCREEN_POS) != Color.White():
+			if self.clock.time() > tEnd:
 				self._ser.write(next(self._directions).encode())
-				tEnd = time.time() + self._delay
+				tEnd = self.clock.time() + self._delay
 		print("encounter!")
 		self._ser.write(b"0")
 
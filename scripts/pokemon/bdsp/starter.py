@@ -1,17 +1,20 @@
 import argparse
-import time
 from typing import Any
+from typing import Final
 from typing import Optional
 
 from lib import Button
 from lib import Color
 from lib import Frame
+from lib import Macro
 from lib import RequirementsAction
+from lib import Step
 from lib.pokemon import ExecShiny
 from lib.pokemon import LOG_DELAY
 from lib.pokemon.bdsp import BDSPScript
 from lib.pokemon.bdsp import ENCOUNTER_DIALOG_POS_2
 from lib.pokemon.bdsp import OWN_POKEMON_POS
+from lib.pokemon.bdsp import OWN_SPARKLE_ROI
 
 
 _Requirements: tuple[str, ...] = ("Stand in front of transition into Lake Verity",)
@@ -19,8 +22,25 @@ Parser = argparse.ArgumentParser(add_help=False)
 Parser.add_argument("-r", "--requriements", action=RequirementsAction, help="print out the requirements for a script", requirements=_Requirements)
 Parser.add_argument("target", type=str, choices=("Chimchar", "Piplup", "Turtwig"), help="starter to reset for")
 
+# through the intro cutscene to the bag
+_INTRO: Final[Macro] = Macro(
+	(
+		*(Step(Button.BUTTON_A, gap=2.075),) * 12,
+		*(Step(Button.BUTTON_A, gap=5.575),) * 4,
+		*(Step(Button.BUTTON_A, gap=2.075),) * 3,
+	),
+	name="intro",
+)
+_TO_BAG: Final[Macro] = Macro(
+	(step for wait in (7, 2, 2, 5, 2, 5) for step in (Step.wait(wait), Step(Button.BUTTON_A))),
+	name="move to bag",
+)
+
 
 class Script(BDSPScript):
+	# the starter is the own pokemon, not the opponent
+	sparkleRoi = OWN_SPARKLE_ROI
+
 	def __init__(self, *args, **kwargs) -> None:
 		super().__init__(*args, **kwargs)
 
@@ -50,14 +70,10 @@ class Script(BDSPScript):
 		self.waitAndRender(1)
 
 		# TODO replace with self.whileColor
-		self.pressN(Button.BUTTON_A, 12, 2, render=True)
-		self.pressN(Button.BUTTON_A, 4, 5.5, render=True)
-		self.pressN(Button.BUTTON_A, 3, 2, render=True)
+		self.runMacro(_INTRO)
 
 		print("move to bag")
-		for v in (7, 2, 2, 5, 2, 5):
-			self.waitAndRender(v)
-			self.press(Button.BUTTON_A)
+		self.runMacro(_TO_BAG)
 
 		print("select starter")
 		self.press(Button.BUTTON_B)
@@ -77,15 +93,17 @@ class Script(BDSPScript):
 		self.awaitFlash(ENCOUNTER_DIALOG_POS_2, Color.White())
 		self.awaitFlash(ENCOUNTER_DIALOG_POS_2, Color.White())
 
-		encounterFrame = self.getframe()
+		encounterFrame = self.getframe().copy()
 
-		t0 = time.time()
-		self.awaitColor(OWN_POKEMON_POS, Color.White())
-		diff = time.time() - t0
+		t0 = self.clock.time()
+		with self.measureMotion(self._sparkles):
+			self.awaitColor(OWN_POKEMON_POS, Color.White())
+		diff = self.clock.time() - t0
+		sparkle = self.recordSparkle()
 
-		self.log(LOG_DELAY, f"dialog delay: {diff:.3f}s")
+		self.log(LOG_DELAY, f"dialog delay: {diff:.3f}s | sparkle energy: {sparkle:.2f}")
 
 		if 15 > diff > 2:
-			raise ExecShiny(e + 1, encounterFrame)
+			raise ExecShiny(e + 1, encounterFrame, features={"sparkle energy": sparkle})
 		else:
 			return (e + 1, encounterFrame)
@@ -65,7 +65,7 @@ class Runner(PokemonRunner):
 		self.crashes = 0
 
 		self.lastRunDuration = timedelta(0, 0)
-		self.runStart = datetime.now()
+		self.runStart = self.clock.time()
 
 	@property
 	def key(self) -> str:
@@ -79,14 +79,14 @@ class Runner(PokemonRunner):
 		self.script.waitAndRender(5)
 
 	def run(self) -> None:
-		self.runStart = datetime.now()
+		self.runStart = self.clock.time()
 		self.encountersTotal, _ = self.script(self.encountersTotal)
 
 		# TODO
 
 	def runPost(self) -> None:
 		# TODO
-		self.lastRunDuration = datetime.now() - self.runStart
+		self.lastRunDuration = timedelta(seconds=self.clock.time() - self.runStart)
 		self._runs.append(self.lastRunDuration.total_seconds())
 		self.encountersCurrent += 1
 
@@ -95,10 +95,14 @@ class Runner(PokemonRunner):
 		raise NotImplementedError
 
 	def onLock(self, lock: lib.ExecLock) -> RunnerAction:
+		self.script._cap.dumpClip(f"logs/clips/lock-{datetime.now():%Y%m%d-%H%M%S}")
+
 		# TODO
 		raise NotImplementedError
 
 	def onShiny(self, shiny: ExecShiny) -> RunnerAction:
+		self.script._cap.dumpClip(f"logs/clips/shiny-{datetime.now():%Y%m%d-%H%M%S}")
+
 		# TODO
 		raise NotImplementedError
 
@@ -125,6 +129,7 @@ class Runner(PokemonRunner):
 		# if self.script.showLastRunDuration is True:
 		# 	stats.append(("Last run duration", _stripTD(self.lastRunDuration)))
 
+		stats.extend(self.script._cap.stats())
 		stats.extend(self.script.extraStats)
 
 		return tuple(stats)
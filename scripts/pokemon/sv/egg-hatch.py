@@ -1,10 +1,7 @@
 import argparse
-import time
 from typing import Any
 from typing import Optional
 
-import serial
-
 from lib import Button
 from lib import Capture
 from lib import Color
@@ -12,6 +9,8 @@ from lib import ExecStop
 from lib import Frame
 from lib import Pos
 from lib import RequirementsAction
+from lib import ScreenSignature
+from lib import SerialWriter
 from lib.pokemon.sv import SVScript
 
 
@@ -21,12 +20,12 @@ Parser.add_argument("-r", "--requriements", action=RequirementsAction, help="pri
 Parser.add_argument("eggcount", type=int, choices=(1, 2, 3, 4, 5), help="amount of eggs to hatch")
 
 
-dialogPositions = (Pos(500, 370), Pos(280, 400))
 dialogColor = Color(3, 28, 35)
+dialog = ScreenSignature(((Pos(500, 370), dialogColor), (Pos(280, 400), dialogColor)), name="dialog")
 
 
 class Script(SVScript):
-	def __init__(self, ser: serial.Serial, cap: Capture, config: dict[str, Any], **kwargs) -> None:
+	def __init__(self, ser: SerialWriter, cap: Capture, config: dict[str, Any], **kwargs) -> None:
 		super().__init__(ser, cap, config, **kwargs)
 
 		self.count: int = kwargs.pop("eggcount")
@@ -47,23 +46,23 @@ class Script(SVScript):
 	def main(self, e: int) -> tuple[int, Frame]:
 		frame: Frame
 
-		tEnd = time.time() + 30
+		tEnd = self.clock.time() + 30
 
 		self._ser.write(Button.L_LEFT.encode())
 		while True:
-			frame = self.getframe()
-			if all(frame.colorAt(pos) == dialogColor for pos in dialogPositions):
+			frame = self.getnextframe()
+			if dialog(frame):
 				break
-			if time.time() > tEnd:
+			if self.clock.time() > tEnd:
 				self.press(Button.EMPTY)
 				self._ser.write(Button.L_LEFT.encode())
-				tEnd = time.time() + 30
+				tEnd = self.clock.time() + 30
 
 		self.press(Button.EMPTY)
 
 		# while True:
 		# 	frame = self.getframe()
-		# 	if all(frame.colorAt(pos) == dialogColor for pos in dialogPositions):
+		# 	if dialog(frame):
 		# 		break
 		# 	self.press(Button.L_LEFT, 3, render=True)
 